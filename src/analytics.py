@@ -0,0 +1,202 @@
+"""
+Single-pass analytics over session logs written by log_session_event.
+
+    python -m src.analytics logs/ --workers 4 --out report.json
+
+Reads *.jsonl files and rotated segments (*.jsonl.<stamp>, *.gz) as streams in chunks of lines,
+so memory depends on the number of learners/labels, not on log size. Every file is reduced to a
+mergeable Aggregate in a worker process, and the partial aggregates are merged at the end.
+
+Recognized event fields (missing ones are skipped): learner (or session), target, pred,
+correct, reaction_ms, level, tempo_bpm, timestamp; level/tempo may also sit under "coach".
+"""
+from __future__ import annotations
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import glob
+import gzip
+import json
+import math
+import os
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with relative error `alpha`; merging adds bucket counts."""
+    def __init__(self, alpha: float = 0.01):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Counter = Counter()
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        if x <= 0:
+            self.zeros += 1
+        else:
+            self.buckets[math.ceil(math.log(x) / self._log_gamma)] += 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.buckets.update(other.buckets)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if rank < seen:
+                return 2 * self.gamma ** k / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+class _Tally:
+    __slots__ = ("total", "correct", "rt")
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.rt = QuantileSketch()
+
+    def merge(self, other: "_Tally") -> None:
+        self.total += other.total
+        self.correct += other.correct
+        self.rt.merge(other.rt)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.total,
+            "accuracy": round(self.correct / self.total, 4) if self.total else None,
+            "reaction_ms": {f"p{int(q * 100)}": _round(self.rt.quantile(q)) for q in (0.5, 0.9, 0.99)},
+        }
+
+def _round(v: Optional[float]) -> Optional[float]:
+    return None if v is None else round(v, 1)
+
+class Aggregate:
+    """Per-learner and per-label statistics for a stream of events; mergeable across files."""
+    def __init__(self):
+        self.events = 0
+        self.bad_lines = 0
+        self.learners: Dict[str, _Tally] = defaultdict(_Tally)
+        self.labels: Dict[str, _Tally] = defaultdict(_Tally)
+        self.confusion: Counter = Counter()
+        # learner -> list of (timestamp, level, tempo) change points
+        self.trajectory: Dict[str, List[Tuple[int, Any, Any]]] = defaultdict(list)
+
+    def update(self, e: Dict[str, Any]) -> None:
+        self.events += 1
+        learner = str(e.get("learner", e.get("session", "unknown")))
+        target, pred = e.get("target"), e.get("pred")
+        coach = e.get("coach") or {}
+        if target is not None and pred is not None:
+            correct = bool(e["correct"]) if "correct" in e else (pred == target)
+            rt = e.get("reaction_ms")
+            for tally in (self.learners[learner], self.labels[str(target)]):
+                tally.total += 1
+                tally.correct += correct
+                if rt is not None:
+                    tally.rt.add(float(rt))
+            self.confusion[(str(target), str(pred))] += 1
+        level = e.get("level", coach.get("level"))
+        tempo = e.get("tempo_bpm", coach.get("tempo_bpm"))
+        if level is not None or tempo is not None:
+            traj = self.trajectory[learner]
+            if not traj or traj[-1][1:] != (level, tempo):
+                traj.append((int(e.get("timestamp", 0)), level, tempo))
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        self.events += other.events
+        self.bad_lines += other.bad_lines
+        for k, t in other.learners.items():
+            self.learners[k].merge(t)
+        for k, t in other.labels.items():
+            self.labels[k].merge(t)
+        self.confusion.update(other.confusion)
+        for k, pts in other.trajectory.items():
+            merged = sorted(self.trajectory[k] + pts, key=lambda p: p[0])
+            self.trajectory[k] = [p for i, p in enumerate(merged) if i == 0 or p[1:] != merged[i - 1][1:]]
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "bad_lines": self.bad_lines,
+            "learners": {
+                k: {**t.to_dict(), "trajectory": [
+                    {"timestamp": ts, "level": lv, "tempo_bpm": tp} for ts, lv, tp in self.trajectory.get(k, [])
+                ]} for k, t in sorted(self.learners.items())
+            },
+            "labels": {k: t.to_dict() for k, t in sorted(self.labels.items())},
+            "confusion": [
+                {"target": t, "pred": p, "count": c} for (t, p), c in self.confusion.most_common()
+            ],
+        }
+
+def _open(path: str):
+    return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, encoding="utf-8")
+
+def iter_chunks(path: str, chunk_lines: int = 10000) -> Iterator[List[str]]:
+    with _open(path) as f:
+        while True:
+            chunk = list(islice(f, chunk_lines))
+            if not chunk:
+                return
+            yield chunk
+
+def aggregate_file(path: str, chunk_lines: int = 10000) -> Aggregate:
+    agg = Aggregate()
+    for chunk in iter_chunks(path, chunk_lines):
+        for line in chunk:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                agg.update(json.loads(line))
+            except (ValueError, TypeError, AttributeError):
+                agg.bad_lines += 1
+    return agg
+
+def find_logs(paths: Iterable[str]) -> List[str]:
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            out += [f for f in glob.glob(os.path.join(p, "**", "*.jsonl*"), recursive=True) if os.path.isfile(f)]
+        else:
+            out.append(p)
+    return sorted(set(out))
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Stream session logs into per-learner / per-label statistics.")
+    ap.add_argument("paths", nargs="+", help="Log files or folders (searched for *.jsonl*)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk-lines", type=int, default=10000)
+    ap.add_argument("--out", default="", help="Write the JSON report here instead of stdout")
+    args = ap.parse_args(argv)
+
+    files = find_logs(args.paths)
+    total = Aggregate()
+    if args.workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for part in pool.map(aggregate_file, files, [args.chunk_lines] * len(files)):
+                total.merge(part)
+    else:
+        for f in files:
+            total.merge(aggregate_file(f, args.chunk_lines))
+
+    report = {"files": len(files), **total.to_dict()}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"{len(files)} files, {total.events} events -> {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
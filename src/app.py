@@ -11,13 +11,24 @@ import numpy as np
 import cv2
 
 from src.core.hand_tracking import HandTracker
-from src.core.gesture_classifier import GestureClassifier
+from src.core.model_registry import get_classifier
 from src.core.engine_cvzone import CvzoneDetector
+from src.core.finger_state import FingerStateClassifier
+from src.core.multi_hand import MultiHandRecognizer
 from src.core.feedback_engine import AdaptiveCoach
 from src.core.sound_engine import SoundEngine
+from src.core.smoothing import LabelSmoother
+from src.core.pipeline import FramePipeline
+from src.core.overlay import OVERLAY
+from src.core.presenter import FramePublisher, WidgetCache
+from src.utils.metrics import METRICS, PrometheusFileExporter
 from src.modes.tutorial import TutorialMode
 from src.modes.free_play import FreePlayMode
 from src.utils.features import extract_features
+from src.utils.mappings import composite_label
+from src.utils.storage import log_session_event
+
+SESSION_LOG = "logs/session_events.jsonl"
 
 st.set_page_config(page_title="Guided Piano", layout="wide")
 st.title("🎹 Guided Piano — Adaptive Gesture-Based Learning")
@@ -25,7 +36,10 @@ st.write("Webcam demo with **Tutorial** and **Free Play** modes. Click **Start/S
 
 # Sidebar controls
 mode = st.sidebar.radio("Mode", ["Tutorial", "Free Play"])
-backend = st.sidebar.selectbox("Detection Backend", ["MediaPipe + Classifier", "cvzone (no-training)"])
+backend = st.sidebar.selectbox("Detection Backend", ["MediaPipe + Classifier", "MediaPipe + finger rules (no-training)",
+                                                    "cvzone (no-training)"])
+two_hands = st.sidebar.checkbox("Two-hand chords (left hand = bass)", value=False,
+                                disabled=backend == "cvzone (no-training)")
 start_btn = st.sidebar.button("Start/Stop")
 
 # Reset & lock controls
@@ -34,6 +48,28 @@ if st.sidebar.button("↩ Reset to Level 1"):
     st.session_state._tutorial_reset = True  # apply after state_mode is created
 
 lock_lvl = st.sidebar.checkbox("Lock level at 1", value=False)
+learner = st.sidebar.text_input("Learner", value="guest")
+smooth_on = st.sidebar.checkbox("Temporal smoothing", value=True)
+smooth_window = st.sidebar.slider("Smoothing window (frames)", 3, 15, 7, step=2)
+# Preview bandwidth cap; inference and the modes still see every camera frame
+preview_fps = st.sidebar.slider("Preview FPS", 5, 30, 15)
+
+# Stage timers + counters; exported for a local Prometheus scraper while enabled
+METRICS_PATH = "metrics/guided_piano.prom"
+METRICS.enabled = st.sidebar.checkbox("Instrumentation", value=False)
+if METRICS.enabled and "metrics_exporter" not in st.session_state:
+    st.session_state.metrics_exporter = PrometheusFileExporter(METRICS_PATH, interval=5.0).start()
+elif not METRICS.enabled and "metrics_exporter" in st.session_state:
+    st.session_state.pop("metrics_exporter").stop()
+metrics_box = st.sidebar.empty()
+
+def render_metrics():
+    snap = METRICS.snapshot()
+    rows = ["| stage | n | mean | p50 | p95 |", "|---|---:|---:|---:|---:|"]
+    for name, s in sorted(snap["stages"].items()):
+        rows.append(f"| {name} | {s['count']} | {s['mean_ms']:.2f} | ≤{s['p50_ms']:g} | ≤{s['p95_ms']:g} |")
+    counters = ", ".join(f"{k}: {v}" for k, v in sorted(snap["counters"].items()))
+    metrics_box.markdown("**Latency (ms)**\n\n" + "\n".join(rows) + (f"\n\n{counters}" if counters else ""))
 
 if "running" not in st.session_state:
     st.session_state.running = False
@@ -71,10 +107,11 @@ with tech_tab:
 
 with live_tab:
     # Lazy init of engines
-    if backend == "MediaPipe + Classifier":
-        if "tracker" not in st.session_state:
+    if backend.startswith("MediaPipe"):
+        max_hands = 2 if two_hands else 1
+        if "tracker" not in st.session_state or st.session_state.tracker.max_hands != max_hands:
             try:
-                st.session_state.tracker = HandTracker()
+                st.session_state.tracker = HandTracker(max_hands=max_hands, roi=True)
             except Exception as e:
                 st.error(f"HandTracker init failed: {e}")
     else:
@@ -88,24 +125,33 @@ with live_tab:
         st.session_state.sound = SoundEngine()
     if "coach" not in st.session_state:
         st.session_state.coach = AdaptiveCoach()
+    if st.session_state.get("smoother") is None or st.session_state.smoother.window != smooth_window:
+        st.session_state.smoother = LabelSmoother(window=smooth_window)
 
-    # Classifier only for MediaPipe path
+    # Classifier only for MediaPipe path; without a model the finger rules take over
     clf = None
+    fingers = FingerStateClassifier() if backend != "cvzone (no-training)" else None
     if backend == "MediaPipe + Classifier":
         try:
-            clf_try = GestureClassifier()
-            clf_try.load("models/gesture_model.pkl")
-            clf = clf_try
+            # Loaded once per process and shared across reruns/sessions; reloaded when the file changes
+            clf = get_classifier("models/gesture_model.pkl")
         except Exception:
-            st.warning("No trained classifier found (models/gesture_model.pkl). Using a stub label.")
+            st.warning("No trained classifier found (models/gesture_model.pkl). Using finger rules instead.")
+    # Every hand of a frame in one batched call; per-hand labels combine into composite labels
+    multi = MultiHandRecognizer(clf, fingers) if two_hands and fingers is not None else None
 
     # Mode wiring (NO Challenge)
     if mode == "Tutorial":
-        if backend == "cvzone (no-training)":
+        if clf is None:
+            # cvzone and finger rules both produce the FINGER_TO_LABEL chords
             lesson = ["CHORD_D_MAJOR", "CHORD_E_MINOR", "CHORD_FSHARP_MINOR", "CHORD_G_MAJOR", "CHORD_A_MAJOR"]
-            state_mode = TutorialMode(st.session_state.coach, st.session_state.sound, lesson=lesson)
+            state_mode = TutorialMode(st.session_state.coach, st.session_state.sound, lesson=lesson,
+                                      events=smooth_on)
         else:
-            state_mode = TutorialMode(st.session_state.coach, st.session_state.sound)
+            state_mode = TutorialMode(st.session_state.coach, st.session_state.sound, events=smooth_on)
+        if multi is not None:
+            # Same gestures on both hands: each chord over its own root in the bass
+            state_mode.lesson = [composite_label(lbl, lbl) for lbl in state_mode.lesson]
     else:
         state_mode = FreePlayMode(st.session_state.sound)
 
@@ -141,16 +187,46 @@ with live_tab:
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 360)
             last_ts = time.time()
+            last_event_ms = last_ts * 1000
+            st.session_state.smoother.reset()
+            info = {"target": state_mode.target_label(), "done": state_mode.is_done(),
+                    "coach": st.session_state.coach.summary()} if mode == "Tutorial" else {}
+
+            # Worker threads must not touch st.session_state; bind what inference needs here
+            tracker = st.session_state.get("tracker")
+            cvz = st.session_state.get("cvz")
+
+            def infer(frame):
+                """Runs on the inference thread: detection, classification and landmark drawing."""
+                img = frame.image
+                if backend == "cvzone (no-training)":
+                    return cvz.infer(img)
+                hands = tracker.process(frame.view())
+                img = tracker.draw(img, hands)
+                label, conf = ("", 0.0)
+                if not hands:
+                    METRICS.count("no_hand_frames")
+                if hands and multi is not None:
+                    label, conf = multi.predict(hands)
+                    per_hand = "  ".join(f"{p.handedness[0]}:{p.label}" for p in multi.last)
+                    OVERLAY.text(img, per_hand, (10, 90), 0.6, (0,255,255), 2)
+                elif hands:
+                    if clf is None:
+                        label, conf = fingers.predict(hands)
+                        OVERLAY.text(img, f"fingers: {fingers.last_raised}", (10, 90), 0.6, (0,255,255), 2)
+                    else:
+                        label, conf = clf.predict_label(extract_features(hands[0].points)["vector"])
+                return label, conf, img
 
+            last_metrics_ts = 0.0
+            publisher = FramePublisher(lambda jpeg: FRAME.image(jpeg, output_format="JPEG"), fps=preview_fps)
+            ui = WidgetCache()
+            pipe = FramePipeline(cap, infer, flip=True).start()
             try:
-                while st.session_state.running:
-                    ok, frame = cap.read()
-                    if not ok:
-                        st.error("Frame grab failed.")
+                for frame in pipe.results():
+                    if not st.session_state.running:
                         break
-
-                    frame = cv2.flip(frame, 1)
-                    out = frame.copy()
+                    label, conf, out = frame.result
 
                     # Optional: freeze level at 1
                     if lock_lvl:
@@ -160,42 +236,38 @@ with live_tab:
                     # === PRE-CHECK for green cue: compare BEFORE advancing ===
                     tgt_before = state_mode.target_label() if mode == "Tutorial" else None
 
-                    if backend == "cvzone (no-training)":
-                        label, conf, drawn = st.session_state.cvz.infer(out)
-                        out = drawn
-                        dt_ms = int((time.time() - last_ts) * 1000)
-                        last_ts = time.time()
-
-                        # did we match current target before it advances?
-                        was_match = (mode == "Tutorial" and tgt_before is not None and label == tgt_before and conf >= 0.6)
-
-                        # advance/update
-                        if mode == "Free Play":
-                            info = state_mode.handle_prediction(label, conf)
-                        else:
-                            info = state_mode.handle_prediction(label, conf, dt_ms)
-
-                    else:
-                        hands = st.session_state.tracker.process(out)
-                        out = st.session_state.tracker.draw(out, hands)
-
-                        label, conf = ("", 0.0)
-                        if hands:
-                            feats = extract_features(hands[0].points)["vector"]
-                            if clf is None:
-                                label, conf = ("NOTE_C4", 0.7)
-                            else:
-                                label, conf = clf.predict_label(feats)
-
-                        dt_ms = int((time.time() - last_ts) * 1000)
-                        last_ts = time.time()
-
-                        was_match = (mode == "Tutorial" and tgt_before is not None and label == tgt_before and conf >= 0.6)
-
+                    dt_ms = int((time.time() - last_ts) * 1000)
+                    last_ts = time.time()
+
+                    # Temporal voting: modes and coach only see stable-label transitions
+                    step = (label, conf, dt_ms)
+                    if smooth_on:
+                        ev = st.session_state.smoother.update(label, conf)
+                        step = None
+                        if ev is not None:
+                            now_ms = time.time() * 1000
+                            step = (ev.label, ev.confidence, int(now_ms - last_event_ms))
+                            last_event_ms = now_ms
+
+                    # did we match current target before it advances?
+                    was_match = (step is not None and mode == "Tutorial" and tgt_before is not None
+                                 and step[0] == tgt_before and step[1] >= 0.6)
+
+                    # advance/update
+                    if step is not None:
                         if mode == "Free Play":
-                            info = state_mode.handle_prediction(label, conf)
+                            info = state_mode.handle_prediction(step[0], step[1])
                         else:
-                            info = state_mode.handle_prediction(label, conf, dt_ms)
+                            info = state_mode.handle_prediction(*step)
+                        # Only predictions the mode scored are attempts; gated and release steps are not
+                        if mode == "Tutorial" and info.get("scored"):
+                            coach = info.get("coach", {})
+                            log_session_event(SESSION_LOG, {
+                                "learner": learner, "mode": mode, "target": tgt_before,
+                                "pred": step[0], "conf": round(float(step[1]), 3), "correct": info["correct"],
+                                "reaction_ms": step[2], "level": coach.get("level"),
+                                "tempo_bpm": coach.get("tempo_bpm"),
+                            })
 
                     # --- Progress & next target (AFTER advancing) ---
                     if mode == "Tutorial" and hasattr(state_mode, "target_label"):
@@ -203,41 +275,52 @@ with live_tab:
                         total = len(getattr(state_mode, "lesson", [])) or 1
                         idx = getattr(state_mode, "idx", 0)
                         if tgt_after is None:
-                            next_target_box.markdown("**Next target:** ✅ Lesson complete!")
-                            prog.progress(100)
+                            ui.update("next", next_target_box.markdown, "**Next target:** ✅ Lesson complete!")
+                            ui.update("progress", prog.progress, 100)
                         else:
-                            next_target_box.markdown(f"**Next target:** `{tgt_after}`")
-                            prog.progress(int(100 * idx / total))
+                            ui.update("next", next_target_box.markdown, f"**Next target:** `{tgt_after}`")
+                            ui.update("progress", prog.progress, int(100 * idx / total))
+
+                    # Metrics tiles
+                    coach = info.get("coach", {}) if isinstance(info, dict) else {}
+                    if coach:
+                        ui.update("m1", m1p.metric, "Accuracy", f"{int(coach.get('accuracy', 0)*100)}%")
+                        ui.update("m2", m2p.metric, "Avg Reaction", f"{coach.get('avg_reaction_ms', 0)} ms")
+                        ui.update("m3", m3p.metric, "Tempo BPM", coach.get("tempo_bpm", 60))
+                        ui.update("m4", m4p.metric, "Level", coach.get("level", 1))
+
+                    if METRICS.enabled:
+                        METRICS.count("frames")
+                        METRICS.observe("frame.e2e", frame.latency_ms())
+                        if time.time() - last_metrics_ts >= 1.0:
+                            render_metrics()
+                            last_metrics_ts = time.time()
+
+                    # Frames between preview ticks are neither decorated nor sent to the browser;
+                    # a match frame always goes out so its green cue is never skipped
+                    if not (was_match or publisher.due()):
+                        continue
 
                     # --- Tutorial hint overlay using pre-check result ---
                     if mode == "Tutorial":
                         if info.get("done"):
-                            cv2.rectangle(out, (10, 100), (630, 140), (0, 0, 0), -1)
-                            cv2.putText(out, "Lesson complete! 🎉", (20, 132),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (40, 180, 60), 2)
+                            OVERLAY.banner(out, "Lesson complete! 🎉", (10, 100, 630, 140), (20, 132),
+                                           0.8, (40, 180, 60))
                         else:
                             tgt_display = tgt_before if tgt_before is not None else info.get("target", "")
                             color = (40, 180, 60) if was_match else (0, 0, 255)
                             msg = f"{'✓ Nice! ' if was_match else '✗ Try again! Play '} {tgt_display}"
-                            cv2.rectangle(out, (10, 100), (630, 140), (0, 0, 0), -1)
-                            cv2.putText(out, msg, (20, 132), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
-
-                    # Metrics tiles
-                    coach = info.get("coach", {}) if isinstance(info, dict) else {}
-                    if coach:
-                        m1p.metric("Accuracy", f"{int(coach.get('accuracy', 0)*100)}%")
-                        m2p.metric("Avg Reaction", f"{coach.get('avg_reaction_ms', 0)} ms")
-                        m3p.metric("Tempo BPM", coach.get("tempo_bpm", 60))
-                        m4p.metric("Level", coach.get("level", 1))
+                            OVERLAY.banner(out, msg, (10, 100, 630, 140), (20, 132), 0.8, color)
 
                     # Prediction banner
                     if label:
-                        cv2.putText(out, f"Pred: {label} ({conf:.2f})", (10, 60),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
+                        OVERLAY.text(out, f"Pred: {label} ({conf:.2f})", (10, 60), 0.6, (0,255,255), 2)
 
-                    FRAME.image(out, channels="BGR")
-                    time.sleep(0.01)
+                    publisher.publish(out)
+                if pipe.error is not None:
+                    st.error(str(pipe.error))
             finally:
+                pipe.stop()
                 cap.release()
     else:
         st.info("Click **Start/Stop** to toggle webcam.")
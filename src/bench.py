@@ -0,0 +1,262 @@
+"""
+Headless per-stage latency benchmark (no webcam needed).
+
+    python -m src.bench --out bench.json
+    python -m src.bench --baseline bench.json --threshold 0.15
+
+Inputs are synthetic: random frames, jittered 21-point hands and a small randomly trained forest.
+Compare tracker.process@WxH with tracker.detect_roi@WxH (e.g. --resolutions 1280x720,1920x1080)
+for the per-frame saving of HandTracker(roi=True) while a hand is tracked.
+Stages whose dependency is missing (mediapipe, cvzone, ...) are reported as skipped.
+With --baseline, exits with status 1 when any stage's p50 or p95 regresses by more than --threshold.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+import cv2
+
+from src.utils.features import extract_features, extract_features_batch
+from src.utils.mappings import HAND_LABELS
+
+# A relaxed open hand in normalized image coords; jittered per sample
+_HAND_TEMPLATE = np.array([
+    [0.50, 0.80], [0.42, 0.74], [0.37, 0.66], [0.33, 0.59], [0.30, 0.53],
+    [0.45, 0.55], [0.44, 0.45], [0.43, 0.39], [0.43, 0.34],
+    [0.50, 0.54], [0.50, 0.43], [0.50, 0.36], [0.50, 0.31],
+    [0.55, 0.55], [0.56, 0.45], [0.56, 0.39], [0.57, 0.34],
+    [0.60, 0.58], [0.62, 0.50], [0.63, 0.45], [0.64, 0.41],
+], dtype=np.float32)
+
+class _NullSound:
+    """Sound sink so mode benchmarks measure mode logic, not the audio backend."""
+    def play_notes(self, notes, dur: float = 0.5, velocity: int = 90):
+        pass
+
+def synthetic_hands(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    jitter = rng.normal(0.0, 0.02, size=(n, 21, 2)).astype(np.float32)
+    shift = rng.uniform(-0.15, 0.15, size=(n, 1, 2)).astype(np.float32)
+    return np.clip(_HAND_TEMPLATE[None] + jitter + shift, 0.0, 1.0)
+
+def synthetic_frames(n: int, width: int, height: int, seed: int = 0) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8) for _ in range(n)]
+
+def train_small_classifier(n_samples: int = 600, n_estimators: int = 50, seed: int = 0):
+    from src.core.gesture_classifier import GestureClassifier
+    labels = sorted(HAND_LABELS)
+    hands = synthetic_hands(n_samples, seed)
+    X = extract_features_batch(hands)
+    rng = np.random.default_rng(seed)
+    y = [labels[i] for i in rng.integers(0, len(labels), n_samples)]
+    clf = GestureClassifier()
+    clf.model.set_params(n_estimators=n_estimators)
+    clf.fit(X, y)
+    return clf
+
+def time_stage(fn: Callable[[int], object], iters: int, warmup: int) -> Dict[str, float]:
+    """Call fn(i) `iters` times after `warmup` calls; return latency percentiles in ms."""
+    for i in range(warmup):
+        fn(i)
+    samples = np.empty(iters, dtype=np.float64)
+    t_start = time.perf_counter()
+    for i in range(iters):
+        t0 = time.perf_counter_ns()
+        fn(i)
+        samples[i] = (time.perf_counter_ns() - t0) / 1e6
+    wall = time.perf_counter() - t_start
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "iters": iters,
+        "mean_ms": round(float(samples.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "throughput_per_s": round(iters / wall, 1),
+    }
+
+def build_stages(resolutions: List[Tuple[int, int]], n_inputs: int = 64) -> List[Tuple[str, Optional[Callable[[int], object]], str]]:
+    """Return (name, fn, skip_reason) for every stage; fn is None when skipped."""
+    stages: List[Tuple[str, Optional[Callable[[int], object]], str]] = []
+    hands = synthetic_hands(n_inputs)
+    feats = extract_features_batch(hands)
+    batch = synthetic_hands(256, seed=1)
+    out = np.empty((len(batch), feats.shape[1]), dtype=np.float32)
+
+    stages.append(("features.extract", lambda i: extract_features(hands[i % n_inputs]), ""))
+    stages.append(("features.batch256", lambda i: extract_features_batch(batch, out=out), ""))
+
+    clf = None
+    try:
+        clf = train_small_classifier()
+        stages.append(("classifier.predict_label", lambda i: clf.predict_label(feats[i % n_inputs]), ""))
+        stages.append(("classifier.sklearn_predict_proba",
+                       lambda i: clf.model.predict_proba(feats[i % n_inputs][None, :]), ""))
+    except Exception as e:
+        stages.append(("classifier.predict_label", None, f"classifier unavailable: {e}"))
+
+    from src.core.feedback_engine import AdaptiveCoach
+    from src.modes.tutorial import TutorialMode
+    lesson = sorted(HAND_LABELS)
+    mode = TutorialMode(AdaptiveCoach(), _NullSound(), lesson=lesson * 1000, debounce_ms=0, release_frames=1)
+    stages.append(("tutorial.handle_prediction",
+                   lambda i: mode.handle_prediction(lesson[i % len(lesson)], 0.9, 120), ""))
+
+    if clf is not None:
+        def post_tracker(i):
+            label, conf = clf.predict_label(extract_features(hands[i % n_inputs])["vector"])
+            mode.handle_prediction(label, conf, 120)
+        stages.append(("pipeline.features_classify_mode", post_tracker, ""))
+
+        # Two-handed frames should cost about one hand's features + classifier call, not two
+        from src.core.hand_tracking import HandLandmarks
+        from src.core.multi_hand import MultiHandRecognizer
+        multi = MultiHandRecognizer(clf)
+        tagged = [HandLandmarks(points=h, handedness=("Left", "Right")[j % 2], score=0.9)
+                  for j, h in enumerate(hands)]
+        stages.append(("multihand.predict_1hand", lambda i: multi.predict(tagged[i % n_inputs:][:1]), ""))
+        stages.append(("multihand.predict_2hands",
+                       lambda i: multi.predict([tagged[i % n_inputs], tagged[(i + 1) % n_inputs]]), ""))
+
+    # Training-free backend: raised fingers of a two-hand frame, then the chord label
+    from src.core.finger_state import fingers_up, hand_labels
+    right = np.array([True, False])
+    stages.append(("fingers.up_2hands",
+                   lambda i: hand_labels(fingers_up(hands[[i % n_inputs, (i + 1) % n_inputs]], right)), ""))
+
+    # Per-frame HUD of the live app: landmarks, handedness, prediction and tutorial banner
+    from src.core.overlay import OverlayCompositor
+    hud_frame = synthetic_frames(1, 640, 360)[0]
+    overlay = OverlayCompositor()
+    def hud_putText(i):
+        img = hud_frame
+        for (x, y) in hands[i % n_inputs]:
+            cv2.circle(img, (int(x * 640), int(y * 360)), 3, (0, 255, 0), -1)
+        cv2.putText(img, "Right (0.95)", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(img, "Pred: NOTE_C4 (0.71)", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        cv2.rectangle(img, (10, 100), (630, 140), (0, 0, 0), -1)
+        cv2.putText(img, "Try again! Play NOTE_C4", (20, 132), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+    def hud_cached(i):
+        img = hud_frame
+        overlay.landmarks(img, [hands[i % n_inputs]], bone_color=None)
+        overlay.text(img, "Right (0.95)", (10, 30), 0.7, (255, 255, 255), 2)
+        overlay.text(img, "Pred: NOTE_C4 (0.71)", (10, 60), 0.6, (0, 255, 255), 2)
+        overlay.banner(img, "Try again! Play NOTE_C4", (10, 100, 630, 140), (20, 132), 0.8, (0, 0, 255))
+    stages.append(("overlay.hud_putText", hud_putText, ""))
+    stages.append(("overlay.hud_cached", hud_cached, ""))
+
+    tracker = None
+    try:
+        from src.core.hand_tracking import HandTracker, HandLandmarks, roi_box
+        tracker = HandTracker(max_hands=1)
+    except Exception as e:
+        stages.append(("tracker", None, f"mediapipe unavailable: {e}"))
+
+    cvz = None
+    try:
+        from src.core.engine_cvzone import CvzoneDetector
+        cvz = CvzoneDetector()
+    except Exception as e:
+        stages.append(("cvzone.infer", None, f"cvzone unavailable: {e}"))
+
+    for (w, h) in resolutions:
+        frames = synthetic_frames(8, w, h)
+        tag = f"@{w}x{h}"
+        if tracker is not None:
+            lms = [HandLandmarks(points=hands[0], handedness="Right", score=0.95)]
+            stages.append(("tracker.process" + tag, lambda i, f=frames: tracker.process(f[i % len(f)]), ""))
+            stages.append(("tracker.draw" + tag, lambda i, f=frames: tracker.draw(f[i % len(f)], lms), ""))
+            # What process() costs on frames where ROI tracking holds: crop around the last hand only
+            box = roi_box(hands[0], w, h, tracker.roi_pad)
+            stages.append(("tracker.detect_roi" + tag, lambda i, f=frames, b=box: tracker.detect(f[i % len(f)], b), ""))
+            if clf is not None:
+                def full(i, f=frames):
+                    frame = f[i % len(f)]
+                    found = tracker.process(frame)
+                    # Synthetic frames contain no hands; classify a synthetic one so every stage runs
+                    pts = found[0].points if found else hands[i % n_inputs]
+                    label, conf = clf.predict_label(extract_features(pts)["vector"])
+                    mode.handle_prediction(label, conf, 120)
+                    tracker.draw(frame, found or lms)
+                stages.append(("pipeline.mediapipe" + tag, full, ""))
+        # Mirror + BGR->RGB per captured frame: fresh arrays vs. in place / reused dst (FramePool)
+        rgb_dst = np.empty_like(frames[0])
+        stages.append(("frame.flip_cvt_alloc" + tag,
+                       lambda i, f=frames: cv2.cvtColor(cv2.flip(f[i % len(f)], 1), cv2.COLOR_BGR2RGB), ""))
+        def pooled(i, f=frames, dst=rgb_dst):
+            img = f[i % len(f)]
+            cv2.flip(img, 1, dst=img)
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=dst)
+        stages.append(("frame.flip_cvt_pooled" + tag, pooled, ""))
+        # One preview publish of the Streamlit app: downscale to 640 px wide + JPEG encode
+        from src.core.presenter import FramePublisher
+        publisher = FramePublisher(lambda jpeg: None, fps=0)
+        stages.append(("ui.publish_jpeg" + tag, lambda i, f=frames, p=publisher: p.publish(f[i % len(f)]), ""))
+        if cvz is not None:
+            stages.append(("cvzone.infer" + tag, lambda i, f=frames: cvz.infer(f[i % len(f)]), ""))
+    return stages
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return human-readable regressions of `current` vs `baseline` beyond `threshold` (fraction)."""
+    problems = []
+    for name, cur in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base or cur.get("skipped") or base.get("skipped"):
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if base[key] > 0 and cur[key] > base[key] * (1.0 + threshold):
+                problems.append(f"{name} {key}: {base[key]:.3f} -> {cur[key]:.3f} ms "
+                                f"(+{100 * (cur[key] / base[key] - 1):.0f}%)")
+    return problems
+
+def _parse_res(s: str) -> List[Tuple[int, int]]:
+    return [tuple(int(v) for v in r.lower().split("x")) for r in s.split(",") if r]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Per-stage latency benchmark with synthetic inputs.")
+    ap.add_argument("--iters", type=int, default=200)
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--resolutions", default="640x360", help="Comma list, e.g. 640x360,1280x720,1920x1080")
+    ap.add_argument("--only", default="", help="Run only stages whose name contains this substring")
+    ap.add_argument("--out", default="", help="Write results JSON here")
+    ap.add_argument("--baseline", default="", help="Compare against this results JSON")
+    ap.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown vs baseline (0.15 = 15%%)")
+    args = ap.parse_args(argv)
+
+    results = {
+        "meta": {
+            "python": sys.version.split()[0], "numpy": np.__version__, "platform": platform.platform(),
+            "iters": args.iters, "timestamp": int(time.time()),
+        },
+        "stages": {},
+    }
+    for name, fn, reason in build_stages(_parse_res(args.resolutions)):
+        if args.only and args.only not in name:
+            continue
+        if fn is None:
+            results["stages"][name] = {"skipped": reason}
+            print(f"{name:<40} skipped ({reason})")
+            continue
+        r = time_stage(fn, args.iters, args.warmup)
+        results["stages"][name] = r
+        print(f"{name:<40} p50 {r['p50_ms']:8.3f}  p95 {r['p95_ms']:8.3f}  p99 {r['p99_ms']:8.3f} ms"
+              f"  {r['throughput_per_s']:10.1f}/s")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(results, json.load(f), args.threshold)
+        for p in problems:
+            print("REGRESSION", p)
+        return 1 if problems else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
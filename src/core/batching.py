@@ -0,0 +1,135 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import threading
+import time
+import numpy as np
+
+from src.utils.metrics import METRICS, Histogram
+
+class _Request:
+    __slots__ = ("x", "future", "t_submit")
+    def __init__(self, x: np.ndarray, future: Future, t_submit: float):
+        self.x = x
+        self.future = future
+        self.t_submit = t_submit
+
+class BatchingPredictor:
+    """
+    Micro-batching front end for GestureClassifier.predict_label.
+      - callers on any thread submit() one feature vector and get a Future of (label, confidence)
+      - a worker thread closes a batch at `max_batch` requests or `max_wait_us` after its first one
+      - each batch is one predict_labels() call on the stacked matrix
+    max_wait_us bounds the latency added to a lone request; larger batches amortize the per-call
+    overhead. stats() reports batch sizes and queue waits for tuning the two.
+    """
+    def __init__(self, classifier, max_batch: int = 32, max_wait_us: int = 500):
+        self.clf = classifier
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_us = max(0, int(max_wait_us))
+        self._max_wait_s = self.max_wait_us / 1e6
+
+        self._pending: Deque[_Request] = deque()
+        self._cv = threading.Condition()
+        self._closed = False
+        self.batch_sizes = np.zeros(self.max_batch + 1, dtype=np.int64)
+        self.queue_wait = Histogram()
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="batching-predictor", daemon=True)
+        self._thread.start()
+
+    def submit(self, x: np.ndarray) -> Future:
+        fut: Future = Future()
+        req = _Request(np.asarray(x, dtype=np.float32), fut, time.perf_counter())
+        with self._cv:
+            if self._closed:
+                raise RuntimeError("BatchingPredictor is closed")
+            self._pending.append(req)
+            # The worker only needs waking to open a batch or to close a full one
+            n = len(self._pending)
+            if n == 1 or n >= self.max_batch:
+                self._cv.notify()
+        return fut
+
+    def predict_label(self, x: np.ndarray, timeout: Optional[float] = None) -> Tuple[str, float]:
+        """Blocking drop-in for GestureClassifier.predict_label."""
+        return self.submit(x).result(timeout)
+
+    async def predict_label_async(self, x: np.ndarray) -> Tuple[str, float]:
+        return await asyncio.wrap_future(self.submit(x))
+
+    def _take_batch(self) -> Optional[List[_Request]]:
+        with self._cv:
+            while not self._pending and not self._closed:
+                self._cv.wait()
+            if not self._pending:
+                return None
+            deadline = self._pending[0].t_submit + self._max_wait_s
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cv.wait(remaining)
+            n = min(len(self._pending), self.max_batch)
+            return [self._pending.popleft() for _ in range(n)]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            t0 = time.perf_counter()
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            for r in batch:
+                self.queue_wait.observe((t0 - r.t_submit) * 1000.0)
+            self.batch_sizes[len(batch)] += 1
+            METRICS.observe("batcher.queue_wait", (t0 - batch[0].t_submit) * 1000.0)
+            try:
+                with METRICS.timer("batcher.predict"):
+                    results = self.clf.predict_labels(np.stack([r.x for r in batch]))
+            except Exception as e:
+                self.errors += 1
+                for r in batch:
+                    r.future.set_exception(e)
+                continue
+            for r, res in zip(batch, results):
+                r.future.set_result(res)
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = self.batch_sizes
+        batches = int(sizes.sum())
+        requests = int((sizes * np.arange(len(sizes))).sum())
+        cum = np.cumsum(sizes)
+        size_q = {f"batch_p{q}": int(np.searchsorted(cum, q / 100 * batches)) if batches else 0 for q in (50, 95)}
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_us": self.max_wait_us,
+            "batches": batches,
+            "requests": requests,
+            "mean_batch": round(requests / batches, 2) if batches else 0.0,
+            **size_q,
+            "full_batches": int(sizes[-1]),
+            "queue_wait_mean_ms": round(self.queue_wait.total_ms / requests, 4) if requests else 0.0,
+            "queue_wait_p50_ms": self.queue_wait.quantile(0.50),
+            "queue_wait_p99_ms": self.queue_wait.quantile(0.99),
+            "pending": len(self._pending),
+            "errors": self.errors,
+        }
+
+    def close(self) -> None:
+        """Stop accepting requests; everything already submitted is still answered."""
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        self._thread.join(timeout=2.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from typing import Any, Dict, Hashable, Optional
+import numpy as np
+
+class CoachStore:
+    """
+    AdaptiveCoach state for many learners as struct-of-arrays: one preallocated NumPy column per
+    field, row i = learner i. update() applies AdaptiveCoach.update to a whole batch at once
+    and yields exactly the same totals, EMA reaction time, rolling accuracy, tempo and level.
+    Capacity doubles when learners are added past it.
+    """
+    def __init__(self, capacity: int = 1024, window: int = 20, tempo_bpm: int = 60, level: int = 1):
+        self.window = window
+        self._init_tempo = tempo_bpm
+        self._init_level = level
+        self.n = 0
+        self._keys: Dict[Hashable, int] = {}
+        self._alloc(max(1, capacity))
+
+    def _alloc(self, cap: int) -> None:
+        old = getattr(self, "total", None)
+        cols = {
+            "total": np.zeros(cap, dtype=np.int64),
+            "correct": np.zeros(cap, dtype=np.int64),
+            "avg_reaction_ms": np.zeros(cap, dtype=np.float64),
+            "tempo_bpm": np.full(cap, self._init_tempo, dtype=np.int32),
+            "level": np.full(cap, self._init_level, dtype=np.int32),
+            # rolling window (ring buffer per row)
+            "win_correct": np.zeros((cap, self.window), dtype=np.bool_),
+            "win_reaction": np.zeros((cap, self.window), dtype=np.float32),
+            "win_pos": np.zeros(cap, dtype=np.int32),
+            "win_n": np.zeros(cap, dtype=np.int32),
+            "win_n_correct": np.zeros(cap, dtype=np.int32),
+        }
+        for name, arr in cols.items():
+            if old is not None:
+                arr[:self.n] = getattr(self, name)[:self.n]
+            setattr(self, name, arr)
+        self.capacity = cap
+
+    def add_learners(self, count: int = 1) -> np.ndarray:
+        """Allocate `count` fresh learners and return their ids."""
+        while self.n + count > self.capacity:
+            self._alloc(self.capacity * 2)
+        ids = np.arange(self.n, self.n + count)
+        self.n += count
+        return ids
+
+    def id_for(self, key: Hashable) -> int:
+        """Stable learner id for an external key (session id, user name, ...)."""
+        i = self._keys.get(key)
+        if i is None:
+            i = self._keys[key] = int(self.add_learners(1)[0])
+        return i
+
+    def update(self, ids, correct, reaction_ms) -> None:
+        """Batched AdaptiveCoach.update; repeated ids are applied in order of appearance."""
+        ids = np.asarray(ids, dtype=np.int64)
+        correct = np.asarray(correct, dtype=np.bool_)
+        reaction_ms = np.asarray(reaction_ms, dtype=np.float64)
+        if len(ids) and (ids.min() < 0 or ids.max() >= self.n):
+            raise IndexError("learner id out of range")
+        # Each round takes the first remaining occurrence of every id, so rows are unique per round
+        order = np.arange(len(ids))
+        while len(order):
+            _, first = np.unique(ids[order], return_index=True)
+            take = order[np.sort(first)]
+            self._update_unique(ids[take], correct[take], reaction_ms[take])
+            order = np.setdiff1d(order, take, assume_unique=True)
+
+    def _update_unique(self, idx: np.ndarray, c: np.ndarray, rt: np.ndarray) -> None:
+        self.total[idx] += 1
+        self.correct[idx] += c
+        prev = self.avg_reaction_ms[idx]
+        self.avg_reaction_ms[idx] = np.where(self.total[idx] == 1, rt, 0.8 * prev + 0.2 * rt)
+
+        p = self.win_pos[idx]
+        full = self.win_n[idx] == self.window
+        self.win_n_correct[idx] -= np.where(full, self.win_correct[idx, p], False)
+        self.win_n[idx] += ~full
+        self.win_correct[idx, p] = c
+        self.win_reaction[idx, p] = rt
+        self.win_n_correct[idx] += c
+        self.win_pos[idx] = (p + 1) % self.window
+
+        # difficulty rules, as in AdaptiveCoach.update
+        acc = self.win_n_correct[idx] / np.maximum(1, self.win_n[idx])
+        tempo = self.tempo_bpm[idx]
+        self.tempo_bpm[idx] = np.where(acc > 0.9, np.minimum(140, tempo + 5),
+                                       np.where(acc < 0.7, np.maximum(40, tempo - 5), tempo))
+        lvl = self.level[idx]
+        self.level[idx] = np.where((acc > 0.92) & (lvl < 10), lvl + 1,
+                                   np.where((acc < 0.6) & (lvl > 1), lvl - 1, lvl))
+
+    def _percentiles(self, idx: np.ndarray, n: np.ndarray, qs) -> np.ndarray:
+        """Per-row linear-interpolated percentiles of the filled window slots (np.percentile's default)."""
+        filled = np.arange(self.window)[None, :] < n[:, None]
+        # unfilled slots sort to the end as +inf, then read as 0 (rows with no attempts give 0)
+        srt = np.sort(np.where(filled, self.win_reaction[idx], np.inf), axis=1)
+        srt = np.where(filled, srt, 0.0)
+        rows = np.arange(len(idx))
+        last = np.maximum(n - 1, 0)
+        out = np.empty((len(qs), len(idx)))
+        for j, q in enumerate(qs):
+            pos = q / 100.0 * last
+            lo = np.floor(pos).astype(np.int64)
+            hi = np.minimum(lo + 1, last)
+            a, b = srt[rows, lo], srt[rows, hi]
+            out[j] = a + (b - a) * (pos - lo)
+        return out
+
+    def summary(self, ids: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Bulk AdaptiveCoach.summary(): one array per key, rows ordered like `ids` (default: all)."""
+        idx = np.arange(self.n) if ids is None else np.asarray(ids, dtype=np.int64)
+        n = self.win_n[idx]
+        acc = self.win_n_correct[idx] / np.maximum(1, n)
+        pct = self._percentiles(idx, n, (50, 90))
+        return {
+            "accuracy": np.round(acc, 3),
+            "avg_reaction_ms": self.avg_reaction_ms[idx].astype(np.int64),
+            "reaction_p50_ms": pct[0].astype(np.int64),
+            "reaction_p90_ms": pct[1].astype(np.int64),
+            "attempts": self.total[idx].copy(),
+            "tempo_bpm": self.tempo_bpm[idx].copy(),
+            "level": self.level[idx].copy(),
+        }
+
+    def summary_one(self, i: int) -> Dict[str, Any]:
+        """AdaptiveCoach.summary()-style dict for one learner (without per-label detail)."""
+        return {k: v[0].item() for k, v in self.summary(np.array([i])).items()}
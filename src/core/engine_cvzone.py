@@ -1,29 +1,26 @@
 from typing import Tuple, Set, Optional
-import cv2
+
+from src.core.overlay import OVERLAY
+from src.utils.mappings import FINGER_TO_LABEL  # finger index -> chord label (re-exported)
+from src.utils.metrics import timed
 try:
     from cvzone.HandTrackingModule import HandDetector
 except Exception as e:
     HandDetector = None
 
-# Map finger index -> chord label (consistent with utils/mappings.py)
-FINGER_TO_LABEL = {
-    0: "CHORD_D_MAJOR",     # Thumb
-    1: "CHORD_E_MINOR",     # Index
-    2: "CHORD_FSHARP_MINOR",# Middle
-    3: "CHORD_G_MAJOR",     # Ring
-    4: "CHORD_A_MAJOR",     # Pinky
-}
-
 class CvzoneDetector:
     def __init__(self, detection_conf: float = 0.7, max_hands: int = 2):
         if HandDetector is None:
             raise ImportError("cvzone is required. Install with `pip install cvzone`.")
         self.detector = HandDetector(detectionCon=detection_conf, maxHands=max_hands)
 
+    @timed("cvzone.infer")
     def infer(self, frame_bgr) -> Tuple[str, float, any]:
-        """Return (label, confidence, drawn_frame). Picks the first raised finger if multiple are up."""
-        img = frame_bgr.copy()
-        hands, img = self.detector.findHands(img, draw=True)
+        """Return (label, confidence, drawn_frame). Picks the first raised finger if multiple are up.
+
+        Draws on `frame_bgr` in place; pass a copy if the original pixels are still needed.
+        """
+        hands, img = self.detector.findHands(frame_bgr, draw=True)
         label = "NONE"; conf = 0.0
         raised: Set[int] = set()
         if hands:
@@ -39,6 +36,5 @@ class CvzoneDetector:
             label = FINGER_TO_LABEL.get(fidx, "NONE")
             conf = 0.9
         # Draw status text
-        cv2.putText(img, f"cvzone: {sorted(list(raised))}", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,255), 2)
+        OVERLAY.text(img, f"cvzone: {sorted(list(raised))}", (10, 30), 0.7, (0,255,255), 2)
         return label, conf, img
\ No newline at end of file
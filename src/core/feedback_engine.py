@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import numpy as np
 
 @dataclass
 class Metrics:
@@ -7,13 +8,64 @@ class Metrics:
     correct: int = 0
     avg_reaction_ms: float = 0.0
 
+class AttemptWindow:
+    """
+    Last `size` attempts in fixed ring buffers; O(1) update, bounded memory.
+    Percentiles are computed on first request after a push and cached until the next one.
+    """
+    __slots__ = ("correct", "reaction_ms", "pos", "n", "n_correct", "_pct")
+
+    def __init__(self, size: int):
+        self.correct = np.zeros(size, dtype=np.bool_)
+        self.reaction_ms = np.zeros(size, dtype=np.float32)
+        self.pos = 0
+        self.n = 0
+        self.n_correct = 0
+        self._pct: Dict[tuple, Dict[int, int]] = {}
+
+    def push(self, correct: bool, reaction_ms: float) -> None:
+        p = self.pos
+        size = len(self.correct)
+        if self.n == size:
+            self.n_correct -= int(self.correct[p])
+        else:
+            self.n += 1
+        self.correct[p] = correct
+        self.reaction_ms[p] = reaction_ms
+        self.n_correct += int(correct)
+        self.pos = (p + 1) % size
+        self._pct.clear()
+
+    def accuracy(self) -> float:
+        return self.n_correct / max(1, self.n)
+
+    def reaction_percentiles(self, qs=(50, 90)) -> Dict[int, int]:
+        qs = tuple(qs)
+        pct = self._pct.get(qs)
+        if pct is None:
+            if self.n == 0:
+                pct = {q: 0 for q in qs}
+            else:
+                pct = {q: int(v) for q, v in zip(qs, np.percentile(self.reaction_ms[:self.n], qs))}
+            self._pct[qs] = pct
+        return dict(pct)
+
 @dataclass
 class AdaptiveCoach:
     metrics: Metrics = field(default_factory=Metrics)
     tempo_bpm: int = 60
     level: int = 1
+    # Difficulty follows the last `window` attempts; per-label windows hold `label_window` each
+    window: int = 20
+    label_window: int = 10
+    _recent: AttemptWindow = field(init=False, repr=False)
+    _labels: Dict[str, AttemptWindow] = field(init=False, repr=False, default_factory=dict)
+    _summary: Optional[Dict[str, Any]] = field(init=False, repr=False, default=None)
 
-    def update(self, correct: bool, reaction_ms: int):
+    def __post_init__(self):
+        self._recent = AttemptWindow(self.window)
+
+    def update(self, correct: bool, reaction_ms: int, label: Optional[str] = None):
         m = self.metrics
         m.total += 1
         if correct:
@@ -24,8 +76,16 @@ class AdaptiveCoach:
         else:
             m.avg_reaction_ms = 0.8 * m.avg_reaction_ms + 0.2 * reaction_ms
 
-        # difficulty rules
-        acc = (m.correct / max(1, m.total))
+        self._recent.push(correct, reaction_ms)
+        if label is not None:
+            win = self._labels.get(label)
+            if win is None:
+                win = self._labels[label] = AttemptWindow(self.label_window)
+            win.push(correct, reaction_ms)
+        self._summary = None
+
+        # difficulty rules (rolling accuracy, so adaptation never stalls in long sessions)
+        acc = self._recent.accuracy()
         if acc > 0.9:
             self.tempo_bpm = min(140, self.tempo_bpm + 5)
         elif acc < 0.7:
@@ -43,10 +103,25 @@ class AdaptiveCoach:
             return "Focus the target finger lift and keep wrist centered."
 
     def summary(self) -> Dict[str, Any]:
-        acc = (self.metrics.correct / max(1, self.metrics.total))
-        return {
-            "accuracy": round(acc, 3),
-            "avg_reaction_ms": int(self.metrics.avg_reaction_ms),
-            "tempo_bpm": self.tempo_bpm,
-            "level": self.level
-        }
\ No newline at end of file
+        """
+        Cached between updates: modes call this on every frame. After an update only the windows
+        it touched (the recent one and that label's) recompute their percentiles.
+        "attempts" is the lifetime total; per label, "window_attempts" counts its rolling window.
+        """
+        if self._summary is None:
+            pct = self._recent.reaction_percentiles()
+            self._summary = {
+                "accuracy": round(self._recent.accuracy(), 3),
+                "avg_reaction_ms": int(self.metrics.avg_reaction_ms),
+                "reaction_p50_ms": pct[50],
+                "reaction_p90_ms": pct[90],
+                "attempts": self.metrics.total,
+                "labels": {
+                    lbl: {
+                        "accuracy": round(w.accuracy(), 3),
+                        "window_attempts": w.n,
+                        "reaction_p50_ms": w.reaction_percentiles((50,))[50],
+                    } for lbl, w in self._labels.items()
+                },
+            }
+        return {**self._summary, "tempo_bpm": self.tempo_bpm, "level": self.level}
@@ -0,0 +1,63 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+from src.utils.mappings import FINGER_TO_LABEL
+from src.utils.metrics import timed
+
+TIP_IDS = np.array([4, 8, 12, 16, 20])
+NO_FINGER = "NONE"
+_LABELS = [FINGER_TO_LABEL[i] for i in range(5)]
+
+def fingers_up(points: np.ndarray, right: np.ndarray, frame_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """
+    (N, 21, 2|3) landmarks -> (N, 5) bool raised flags [thumb..pinky], cvzone's fingersUp rules:
+      - index..pinky are up when the tip is above (smaller y than) the joint two points below it
+      - the thumb is up when its tip is outward of its IP joint: right of it for `right` hands
+    Pass frame_size=(w, h) to compare truncated pixel coords exactly as cvzone does.
+    """
+    pts = np.asarray(points)[..., :2]
+    if frame_size is not None:
+        pts = (pts * frame_size).astype(np.int64)
+    up = np.empty((len(pts), 5), dtype=bool)
+    np.less(pts[:, TIP_IDS[1:], 1], pts[:, TIP_IDS[1:] - 2, 1], out=up[:, 1:])
+    tip_x, ip_x = pts[:, 4, 0], pts[:, 3, 0]
+    up[:, 0] = np.where(np.asarray(right, dtype=bool), tip_x > ip_x, tip_x < ip_x)
+    return up
+
+def hand_labels(up: np.ndarray) -> List[str]:
+    """Per-hand chord label: the lowest raised finger, or NO_FINGER."""
+    idx = np.argmax(up, axis=1)
+    return [_LABELS[i] if any_up else NO_FINGER for i, any_up in zip(idx, up.any(axis=1))]
+
+class FingerStateClassifier:
+    """
+    Training-free stand-in for CvzoneDetector on HandTracker output: same FINGER_TO_LABEL labels,
+    computed from HandLandmarks.points with array ops across all hands, so one MediaPipe pass
+    serves both backends.
+      - flip_type=True mirrors cvzone's default, which swaps MediaPipe's Left/Right labels
+    predict() returns (label, confidence) like GestureClassifier.predict_label.
+    """
+    def __init__(self, flip_type: bool = True, confidence: float = 0.9):
+        self.flip_type = flip_type
+        self.confidence = confidence
+        self.last_raised: List[int] = []
+
+    def _right(self, handedness: Sequence[str]) -> np.ndarray:
+        return np.array([h == ("Left" if self.flip_type else "Right") for h in handedness], dtype=bool)
+
+    def raised(self, hands, frame_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """(n_hands, 5) raised flags for a list of HandLandmarks."""
+        if not hands:
+            return np.zeros((0, 5), dtype=bool)
+        pts = np.stack([h.points for h in hands])
+        return fingers_up(pts, self._right([h.handedness for h in hands]), frame_size)
+
+    @timed("fingers.predict")
+    def predict(self, hands, frame_size: Optional[Tuple[int, int]] = None) -> Tuple[str, float]:
+        """Union of raised fingers over all hands; the lowest finger index picks the chord."""
+        any_up = self.raised(hands, frame_size).any(axis=0)
+        self.last_raised = np.flatnonzero(any_up).tolist()
+        if not self.last_raised:
+            return NO_FINGER, 0.0
+        return _LABELS[self.last_raised[0]], self.confidence
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict
+import numpy as np
+
+@dataclass
+class FlatForest:
+    """
+    A fitted tree ensemble compiled into flat node arrays shared by all trees.
+      - children[i] = (left, right); leaves point to themselves so traversal needs no leaf test
+      - leaves get threshold +inf, so every sample "goes left" back onto the same leaf
+      - value[i] holds the per-node class distribution, normalized per node like sklearn's predict_proba
+    Traversal advances every (sample, tree) pair one level per step for `max_depth` steps.
+    """
+    feature: np.ndarray    # (n_nodes,) int32
+    threshold: np.ndarray  # (n_nodes,) float64
+    children: np.ndarray   # (n_nodes, 2) int32, absolute node indices
+    value: np.ndarray      # (n_nodes, n_classes) float64
+    roots: np.ndarray      # (n_trees,) int32
+    max_depth: int
+
+    @classmethod
+    def from_sklearn(cls, model) -> "FlatForest":
+        """Compile a fitted sklearn RandomForestClassifier / ExtraTreesClassifier."""
+        feats, thrs, kids, vals, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est in model.estimators_:
+            t = est.tree_
+            n = t.node_count
+            left = t.children_left.astype(np.int64)
+            right = t.children_right.astype(np.int64)
+            leaf = left == -1
+            idx = np.arange(n)
+            left = np.where(leaf, idx, left) + offset
+            right = np.where(leaf, idx, right) + offset
+            v = t.value[:, 0, :].astype(np.float64)
+            v /= np.maximum(v.sum(axis=1, keepdims=True), 1e-300)
+
+            feats.append(np.where(leaf, 0, t.feature).astype(np.int32))
+            thrs.append(np.where(leaf, np.inf, t.threshold))
+            kids.append(np.stack([left, right], axis=1).astype(np.int32))
+            vals.append(v)
+            roots.append(offset)
+            max_depth = max(max_depth, int(t.max_depth))
+            offset += n
+        return cls(
+            feature=np.concatenate(feats),
+            threshold=np.concatenate(thrs),
+            children=np.ascontiguousarray(np.concatenate(kids)),
+            value=np.concatenate(vals),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+        )
+
+    @property
+    def n_classes(self) -> int:
+        return self.value.shape[1]
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """(N, F) -> (N, n_trees) leaf node index per sample and tree."""
+        # sklearn trees compare float32 inputs against float64 thresholds; do the same
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            go_right = X[rows, self.feature[node]] > self.threshold[node]
+            node = self.children[node, go_right.view(np.int8)]
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None, :]
+        return self.value[self.leaves(X)].mean(axis=1)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "feature": self.feature, "threshold": self.threshold, "children": self.children,
+            "value": self.value, "roots": self.roots, "max_depth": np.asarray(self.max_depth),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrs) -> "FlatForest":
+        return cls(
+            feature=arrs["feature"], threshold=arrs["threshold"], children=arrs["children"],
+            value=arrs["value"], roots=arrs["roots"], max_depth=int(arrs["max_depth"]),
+        )
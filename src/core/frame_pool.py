@@ -0,0 +1,85 @@
+from __future__ import annotations
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+import threading
+import numpy as np
+
+from src.utils.metrics import METRICS
+
+Key = Tuple[Tuple[int, ...], str]
+
+class FramePool:
+    """
+    Recycled frame-sized buffers, so the steady-state frame path allocates nothing.
+      - acquire()/release(): whole frames; FramePipeline reads camera frames straight into them
+      - dst(): per-owner scratch arrays used as `dst=` of cv2.cvtColor/resize/flip
+      - adopt(): count an array someone else allocated (e.g. the first cap.read()) and recycle it later
+    Counters (also mirrored to METRICS): allocations, bytes_allocated, and bytes_copied as
+    reported by the stages that convert or copy frame data.
+    """
+    def __init__(self):
+        self._free: Dict[Key, List[np.ndarray]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.bytes_allocated = 0
+        self.bytes_copied = 0
+
+    @staticmethod
+    def _key(shape, dtype) -> Key:
+        return tuple(shape), np.dtype(dtype).str
+
+    def _count_alloc(self, nbytes: int) -> None:
+        self.allocations += 1
+        self.bytes_allocated += nbytes
+        METRICS.count("frame_allocations")
+        METRICS.count("frame_bytes_allocated", nbytes)
+
+    def acquire(self, shape, dtype=np.uint8) -> np.ndarray:
+        with self._lock:
+            free = self._free.get(self._key(shape, dtype))
+            if free:
+                return free.pop()
+        buf = np.empty(shape, dtype=dtype)
+        with self._lock:
+            self._count_alloc(buf.nbytes)
+        return buf
+
+    def release(self, buf: np.ndarray) -> None:
+        if buf is None or buf.base is not None:
+            return  # views and foreign slices are not ours to recycle
+        with self._lock:
+            self._free[self._key(buf.shape, buf.dtype)].append(buf)
+
+    def adopt(self, buf: np.ndarray) -> None:
+        with self._lock:
+            self._count_alloc(buf.nbytes)
+
+    def dst(self, owner: Dict[str, np.ndarray], name: str, shape, dtype=np.uint8) -> np.ndarray:
+        """owner[name] if it already has `shape`/`dtype`, else a new array stored there (counted)."""
+        buf = owner.get(name)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = owner[name] = np.empty(shape, dtype=dtype)
+            with self._lock:
+                self._count_alloc(buf.nbytes)
+        return buf
+
+    def copied(self, nbytes: int) -> None:
+        with self._lock:
+            self.bytes_copied += nbytes
+        METRICS.count("frame_bytes_copied", nbytes)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "allocations": self.allocations,
+            "bytes_allocated": self.bytes_allocated,
+            "bytes_copied": self.bytes_copied,
+            "free_buffers": sum(len(v) for v in self._free.values()),
+        }
+
+FRAMES = FramePool()
+
+def readonly(img: np.ndarray) -> np.ndarray:
+    """Read-only view of `img` (no copy) for stages that must not draw on a shared frame."""
+    v = img.view()
+    v.flags.writeable = False
+    return v
@@ -5,16 +5,27 @@ import numpy as np
 import pickle
 from sklearn.ensemble import RandomForestClassifier
 
+from src.core.forest import FlatForest
+from src.utils.metrics import timed
+from src.utils.storage import load_npz_mmap
+
 @dataclass
 class GestureSample:
     x: np.ndarray  # feature vector
     y: int         # label id
 
 class GestureClassifier:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=200, random_state=42)
+    def __init__(self, n_estimators: int = 200, max_depth: Optional[int] = None,
+                 feature_idx: Optional[List[int]] = None, n_jobs: Optional[int] = None):
+        self.model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                            random_state=42, n_jobs=n_jobs)
         self.label_to_id: Dict[str, int] = {}
         self.id_to_label: Dict[int, str] = {}
+        # Columns of the extract_features vector the model was trained on (None = all)
+        self.feature_idx: Optional[np.ndarray] = None if feature_idx is None else np.asarray(feature_idx, dtype=np.intp)
+        # Compiled copy of the fitted forest; used for inference when present
+        self.flat: Optional[FlatForest] = None
+        self.class_ids: Optional[np.ndarray] = None
 
     def fit(self, X: np.ndarray, y_labels: List[str]) -> None:
         # map labels to ids
@@ -23,23 +34,73 @@ class GestureClassifier:
                 self.label_to_id[lbl] = len(self.label_to_id)
         y = np.array([self.label_to_id[lbl] for lbl in y_labels], dtype=np.int32)
         self.id_to_label = {v: k for k, v in self.label_to_id.items()}
-        self.model.fit(X, y)
+        self.model.fit(self._select(X), y)
+        self.compile()
+
+    def compile(self) -> None:
+        """Flatten the fitted forest into node arrays for fast per-frame inference."""
+        try:
+            self.flat = FlatForest.from_sklearn(self.model)
+        except Exception:
+            self.flat = None
+        self.class_ids = np.asarray(getattr(self.model, "classes_", np.arange(len(self.id_to_label))))
+
+    def _select(self, X: np.ndarray) -> np.ndarray:
+        return X if self.feature_idx is None else X[..., self.feature_idx]
 
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """(N, F) -> (N, n_classes) probabilities, columns ordered as `class_ids`."""
+        X = self._select(X)
+        if self.flat is not None:
+            return self.flat.predict_proba(X)
+        return self.model.predict_proba(X)
+
+    @timed("classifier.predict_label")
     def predict_label(self, x: np.ndarray) -> Tuple[str, float]:
-        proba = self.model.predict_proba(x[None, :])[0]
+        proba = self.predict_proba(x[None, :])[0]
         idx = int(np.argmax(proba))
-        return self.id_to_label[idx], float(proba[idx])
+        return self.id_to_label[int(self.class_ids[idx])], float(proba[idx])
+
+    @timed("classifier.predict_labels")
+    def predict_labels(self, X: np.ndarray) -> List[Tuple[str, float]]:
+        """(N, F) -> one (label, confidence) per row from a single predict_proba call."""
+        proba = self.predict_proba(X)
+        idx = np.argmax(proba, axis=1)
+        conf = proba[np.arange(len(idx)), idx]
+        return [(self.id_to_label[int(c)], float(p)) for c, p in zip(self.class_ids[idx], conf)]
 
     def save(self, path: str) -> None:
+        """Pickle by default; a `.npz` path writes the flat node arrays only (no sklearn objects)."""
+        if path.endswith('.npz'):
+            if self.flat is None:
+                raise ValueError("Nothing to save: classifier has no compiled forest.")
+            labels = [self.id_to_label[i] for i in range(len(self.id_to_label))]
+            extra = {} if self.feature_idx is None else {'feature_idx': self.feature_idx}
+            # Uncompressed so load() can memory-map every array in place
+            np.savez(path, **self.flat.to_arrays(), class_ids=self.class_ids,
+                     labels=np.asarray(labels, dtype=np.str_), **extra)
+            return
         with open(path, 'wb') as f:
             pickle.dump({
                 'model': self.model,
-                'label_to_id': self.label_to_id
+                'label_to_id': self.label_to_id,
+                'feature_idx': self.feature_idx,
             }, f)
 
     def load(self, path: str) -> None:
+        if path.endswith('.npz'):
+            arrs = load_npz_mmap(path)
+            self.model = None
+            self.flat = FlatForest.from_arrays(arrs)
+            self.class_ids = np.asarray(arrs['class_ids'])
+            self.label_to_id = {str(lbl): i for i, lbl in enumerate(arrs['labels'])}
+            self.id_to_label = {v: k for k, v in self.label_to_id.items()}
+            self.feature_idx = np.asarray(arrs['feature_idx']) if 'feature_idx' in arrs else None
+            return
         with open(path, 'rb') as f:
             obj = pickle.load(f)
         self.model = obj['model']
         self.label_to_id = obj['label_to_id']
-        self.id_to_label = {v: k for k, v in self.label_to_id.items()}
\ No newline at end of file
+        self.feature_idx = obj.get('feature_idx')
+        self.id_to_label = {v: k for k, v in self.label_to_id.items()}
+        self.compile()
\ No newline at end of file
@@ -3,6 +3,10 @@ from typing import List, Optional, Tuple, Dict
 import numpy as np
 import cv2
 
+from src.core.frame_pool import FRAMES
+from src.core.overlay import OVERLAY
+from src.utils.metrics import METRICS, timed
+
 try:
     import mediapipe as mp
 except Exception as e:
@@ -16,43 +20,146 @@ class HandLandmarks:
     handedness: str     # 'Left' or 'Right'
     score: float
 
+Box = Tuple[int, int, int, int]  # x0, y0, x1, y1 in pixels
+
+def roi_box(points: np.ndarray, width: int, height: int, pad: float = 0.25) -> Box:
+    """Square pixel box around normalized landmarks, padded by `pad` x its side and kept inside the frame."""
+    pts = np.asarray(points)[..., :2].reshape(-1, 2) * (width, height)
+    (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+    side = max(x1 - x0, y1 - y0) * (1.0 + 2.0 * pad)
+    side = int(min(max(side, 32), width, height))
+    cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+    bx = int(np.clip(cx - side / 2.0, 0, width - side))
+    by = int(np.clip(cy - side / 2.0, 0, height - side))
+    return bx, by, bx + side, by + side
+
 class HandTracker:
-    def __init__(self, max_hands: int = 1, detection_conf: float = 0.5, tracking_conf: float = 0.5):
+    """
+    MediaPipe Hands wrapper.
+      - roi=True: after a detection, the next frame is cropped to a padded square around the previous
+        landmarks and scaled to `roi_size` px square, so detector cost follows hand size, not resolution
+      - ROI landmarks are mapped back to full-frame normalized coordinates
+      - falls back to a full-frame pass when the ROI loses a hand, its score drops below
+        `roi_min_score`, the hand touches the crop edge, or every `redetect_every` frames
+      - the ROI is only used while all `max_hands` hands are tracked; with fewer, every frame gets a
+        full-frame pass so a hand entering the frame is picked up at once
+      - max_side: full-frame passes are downscaled so their longest side is at most this many px
+    """
+    def __init__(self, max_hands: int = 1, detection_conf: float = 0.5, tracking_conf: float = 0.5,
+                 roi: bool = False, roi_pad: float = 0.25, roi_size: int = 256, roi_min_score: float = 0.6,
+                 redetect_every: int = 30, max_side: Optional[int] = None):
         if mp is None:
             raise ImportError("mediapipe is required for HandTracker.")
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        self.max_hands = max_hands
+        self._hands_args = dict(
             static_image_mode=False,
             max_num_hands=max_hands,
             min_detection_confidence=detection_conf,
             min_tracking_confidence=tracking_conf
         )
+        self.hands = self.mp_hands.Hands(**self._hands_args)
         self.drawing = mp.solutions.drawing_utils
         self.drawing_styles = mp.solutions.drawing_styles
 
-    def process(self, frame_bgr: np.ndarray) -> List[HandLandmarks]:
+        self.roi = roi
+        self.roi_pad = roi_pad
+        self.roi_size = roi_size
+        self.roi_min_score = roi_min_score
+        self.redetect_every = redetect_every
+        self.max_side = max_side
+        # Crops get their own graph: MediaPipe's internal tracking assumes a consistent input geometry
+        self._roi_hands = None
+        self._last: List[HandLandmarks] = []
+        self._since_full = 0
+        self.roi_frames = 0
+        self.full_frames = 0
+        self._dst: Dict[str, np.ndarray] = {}
+
+    def _run(self, hands, frame_bgr: np.ndarray, box: Optional[Box], limit: Optional[int]) -> List[HandLandmarks]:
         h, w = frame_bgr.shape[:2]
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        res = self.hands.process(frame_rgb)
+        x0, y0, x1, y1 = box if box is not None else (0, 0, w, h)
+        img = frame_bgr[y0:y1, x0:x1]
+        side = max(x1 - x0, y1 - y0)
+        # Resize and convert into reused dst buffers; the caller's frame is only read
+        size, name = None, ""
+        if box is not None:
+            size, name = (limit, limit), "roi"  # roi_box crops are square
+        elif limit and side > limit:
+            f = limit / side
+            size, name = (max(1, round(w * f)), max(1, round(h * f))), "small"
+        if size is not None:
+            rgb = FRAMES.dst(self._dst, name, (size[1], size[0], 3))
+            cv2.resize(img, size, dst=rgb, interpolation=cv2.INTER_AREA if side > max(size) else cv2.INTER_LINEAR)
+            cv2.cvtColor(rgb, cv2.COLOR_BGR2RGB, dst=rgb)
+        else:
+            rgb = FRAMES.dst(self._dst, "rgb", img.shape)
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=rgb)
+        FRAMES.copied(rgb.nbytes)
+        res = hands.process(rgb)
         out: List[HandLandmarks] = []
         if res.multi_hand_landmarks and res.multi_handedness:
+            # crop-normalized -> full-frame normalized (resizing keeps normalized coords unchanged)
+            scale = np.array([(x1 - x0) / w, (y1 - y0) / h], dtype=np.float32)
+            offset = np.array([x0 / w, y0 / h], dtype=np.float32)
             for lm, hd in zip(res.multi_hand_landmarks, res.multi_handedness):
                 pts = np.array([[p.x, p.y] for p in lm.landmark], dtype=np.float32)
+                if box is not None:
+                    pts = pts * scale + offset
                 handedness = hd.classification[0].label
                 score = hd.classification[0].score
                 out.append(HandLandmarks(points=pts, handedness=handedness, score=score))
         return out
 
+    def detect(self, frame_bgr: np.ndarray, box: Optional[Box] = None) -> List[HandLandmarks]:
+        """One detector pass over the whole frame, or over pixel `box` only (always full-frame coords)."""
+        if box is None:
+            return self._run(self.hands, frame_bgr, None, self.max_side)
+        if self._roi_hands is None:
+            self._roi_hands = self.mp_hands.Hands(**self._hands_args)
+        return self._run(self._roi_hands, frame_bgr, box, self.roi_size)
+
+    def _roi_ok(self, hands: List[HandLandmarks], box: Box, w: int, h: int) -> bool:
+        if len(hands) < len(self._last) or min(hd.score for hd in hands) < self.roi_min_score:
+            return False
+        # A hand touching the crop edge (not the frame edge) is probably leaving the crop
+        x0, y0, x1, y1 = box
+        margin = 0.02 * (x1 - x0)
+        pts = np.concatenate([hd.points for hd in hands]) * (w, h)
+        lo, hi = pts.min(axis=0), pts.max(axis=0)
+        return not ((x0 > 0 and lo[0] < x0 + margin) or (y0 > 0 and lo[1] < y0 + margin) or
+                    (x1 < w and hi[0] > x1 - margin) or (y1 < h and hi[1] > y1 - margin))
+
+    @timed("tracker.process")
+    def process(self, frame_bgr: np.ndarray) -> List[HandLandmarks]:
+        h, w = frame_bgr.shape[:2]
+        out: List[HandLandmarks] = []
+        tracked = (self.roi and len(self._last) >= self.max_hands
+                   and (not self.redetect_every or self._since_full < self.redetect_every))
+        if tracked:
+            box = roi_box(np.stack([hd.points for hd in self._last]), w, h, self.roi_pad)
+            out = self.detect(frame_bgr, box)
+            self.roi_frames += 1
+            METRICS.count("tracker_roi_frames")
+            if not self._roi_ok(out, box, w, h):
+                out, tracked = [], False
+        if not tracked:
+            out = self.detect(frame_bgr)
+            self.full_frames += 1
+            METRICS.count("tracker_full_frames")
+            self._since_full = 0
+        else:
+            self._since_full += 1
+        self._last = out
+        return out
+
+    @timed("tracker.draw")
     def draw(self, frame_bgr: np.ndarray, landmarks: List[HandLandmarks]) -> np.ndarray:
-        if mp is None:
-            return frame_bgr
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        # Points and bones of every hand in one vectorized pass; labels are cached sprites
+        OVERLAY.landmarks(frame_bgr, [lm.points for lm in landmarks])
+        # One hand keeps its label in the corner; with several, each label sits under its own wrist
+        h, w = frame_bgr.shape[:2]
         for lm in landmarks:
-            # Build a faux mediapipe landmark object for drawing
-            lm_obj = self.mp_hands.HandLandmark
-            # We can use drawing utils only with the original results; instead, draw basic circles/lines here.
-            for (x, y) in lm.points:
-                cv2.circle(frame_bgr, (int(x * frame_bgr.shape[1]), int(y * frame_bgr.shape[0])), 3, (0, 255, 0), -1)
-            cv2.putText(frame_bgr, f"{lm.handedness} ({lm.score:.2f})", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            org = (10, 30) if len(landmarks) == 1 else (int(lm.points[0, 0] * w) - 40, int(lm.points[0, 1] * h) + 25)
+            OVERLAY.text(frame_bgr, f"{lm.handedness} ({lm.score:.2f})", org, 0.7, (255, 255, 255), 2)
         return frame_bgr
\ No newline at end of file
@@ -0,0 +1,78 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import os
+import threading
+
+from src.core.gesture_classifier import GestureClassifier
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+@dataclass
+class _Entry:
+    mtime_ns: int
+    size: int
+    digest: str
+    model: Any
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models, shared by every session/rerun in the process.
+      - get() only stats the file when nothing changed
+      - a new mtime/size triggers a hash; the model is reloaded only if the content changed
+    """
+    def __init__(self, loader: Optional[Callable[[str], Any]] = None):
+        self._loader = loader or self._load_classifier
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    @staticmethod
+    def _load_classifier(path: str) -> GestureClassifier:
+        clf = GestureClassifier()
+        clf.load(path)
+        return clf
+
+    def get(self, path: str):
+        key = os.path.abspath(path)
+        st = os.stat(key)  # FileNotFoundError propagates to the caller
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                return entry.model
+            digest = _file_hash(key)
+            if entry is not None and entry.digest == digest:
+                entry.mtime_ns, entry.size = st.st_mtime_ns, st.st_size
+                return entry.model
+            model = self._loader(key)
+            self.loads += 1
+            self._entries[key] = _Entry(st.st_mtime_ns, st.st_size, digest, model)
+            return model
+
+    def evict(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+MODELS = ModelRegistry()
+
+def get_classifier(path: str) -> GestureClassifier:
+    """
+    Shared GestureClassifier for `path`; prefers a sibling .npz over a .pkl when the .npz is at least
+    as new, so a stale export never shadows a retrained pickle.
+    """
+    root, ext = os.path.splitext(path)
+    npz = root + '.npz'
+    if ext == '.pkl' and os.path.exists(npz):
+        try:
+            pkl_mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            pkl_mtime = -1
+        if os.stat(npz).st_mtime_ns >= pkl_mtime:
+            path = npz
+    return MODELS.get(path)
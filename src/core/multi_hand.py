@@ -0,0 +1,69 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+
+from src.core.finger_state import FingerStateClassifier, NO_FINGER, hand_labels
+from src.utils.features import FEATURE_DIM, extract_features_batch
+from src.utils.mappings import LABEL_TO_BASS, LABEL_TO_NOTES, composite_label
+from src.utils.metrics import timed
+
+@dataclass
+class HandPrediction:
+    handedness: str     # 'Left' or 'Right', as reported by the tracker
+    label: str
+    confidence: float
+
+class MultiHandRecognizer:
+    """
+    Classifies every detected hand of a frame at once and combines them into one label.
+      - one extract_features_batch into a reused (n_hands, FEATURE_DIM) buffer, then one
+        classifier.predict_labels call, so a second hand adds rows, not calls
+      - without a classifier the finger rules label all hands in one fingers_up pass
+      - Left + Right -> composite_label(left, right): left-hand bass under the right-hand chord
+      - a single usable hand (or two of the same side) -> the most confident hand's own label
+    Handedness is taken as the tracker reports it, which matches the user's hands on mirrored frames.
+    """
+    def __init__(self, classifier=None, fingers: Optional[FingerStateClassifier] = None,
+                 min_confidence: float = 0.0):
+        self.clf = classifier
+        self.fingers = fingers or FingerStateClassifier()
+        self.min_confidence = min_confidence
+        self._x = np.empty((2, FEATURE_DIM), dtype=np.float32)
+        self.last: List[HandPrediction] = []
+
+    @timed("multihand.classify")
+    def classify(self, hands) -> List[HandPrediction]:
+        """One HandPrediction per HandLandmarks, in the same order."""
+        if not hands:
+            return []
+        if self.clf is None:
+            labels = hand_labels(self.fingers.raised(hands))
+            preds = [(lbl, 0.0 if lbl == NO_FINGER else self.fingers.confidence) for lbl in labels]
+        else:
+            n = len(hands)
+            if len(self._x) < n:
+                self._x = np.empty((n, FEATURE_DIM), dtype=np.float32)
+            X = extract_features_batch(np.stack([h.points for h in hands]), out=self._x[:n])
+            preds = self.clf.predict_labels(X)
+        return [HandPrediction(h.handedness, lbl, conf) for h, (lbl, conf) in zip(hands, preds)]
+
+    def combine(self, preds: List[HandPrediction]) -> Tuple[str, float]:
+        """Per-hand predictions -> (label, confidence); a composite needs both hands, at the lower confidence."""
+        usable = [p for p in preds if p.label in LABEL_TO_NOTES and p.confidence >= self.min_confidence]
+        if not usable:
+            return "", 0.0
+        best = {}
+        for p in usable:
+            if p.confidence > best.get(p.handedness, HandPrediction("", "", -1.0)).confidence:
+                best[p.handedness] = p
+        left, right = best.get("Left"), best.get("Right")
+        if left is not None and right is not None and left.label in LABEL_TO_BASS:
+            return composite_label(left.label, right.label), min(left.confidence, right.confidence)
+        top = max(usable, key=lambda p: p.confidence)
+        return top.label, top.confidence
+
+    def predict(self, hands) -> Tuple[str, float]:
+        """classify() + combine(); the per-hand results stay available in `last`."""
+        self.last = self.classify(hands)
+        return self.combine(self.last)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+import threading
+import numpy as np
+import cv2
+
+from src.utils.metrics import METRICS
+
+Color = Tuple[int, int, int]
+
+# MediaPipe Hands topology (21 points), kept here so drawing does not need mediapipe
+HAND_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+], dtype=np.intp)
+
+class Sprite:
+    """
+    Pre-rendered BGR patch. Opaque sprites are copied; translucent ones keep `inv` = 255 - alpha and
+    `premult` = color * alpha / 255 so blending is two in-place cv2 passes over the sprite's box.
+    """
+    __slots__ = ("bgr", "inv", "premult", "dx", "dy", "h", "w")
+    def __init__(self, bgr: np.ndarray, alpha: Optional[np.ndarray], dx: int, dy: int):
+        # Offset of the sprite's top-left corner from the anchor the caller passes in
+        self.dx, self.dy = dx, dy
+        self.h, self.w = bgr.shape[:2]
+        self.bgr = bgr
+        self.inv = self.premult = None
+        if alpha is not None:
+            a = np.repeat(alpha[..., None], 3, axis=2)
+            self.inv = 255 - a
+            self.premult = cv2.multiply(bgr, a, scale=1 / 255)
+
+def _disk(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    r = np.arange(-radius, radius + 1)
+    yy, xx = np.meshgrid(r, r, indexing="ij")
+    keep = yy * yy + xx * xx <= radius * radius + radius
+    return yy[keep], xx[keep]
+
+class OverlayCompositor:
+    """
+    Cached overlay rendering.
+      - text() and banner() rasterize a string once per distinct content/style into a Sprite (LRU cache)
+        and afterwards only blend that sprite's box into the frame: the dirty region, never the full frame
+      - landmarks() stamps every point of every hand with one fancy-indexed assignment and draws every
+        skeleton bone with one cv2.polylines call
+    Safe to share between the inference and presentation threads.
+    """
+    def __init__(self, max_sprites: int = 256):
+        self.max_sprites = max_sprites
+        self._sprites: "OrderedDict[tuple, Sprite]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disks = {}
+        self.rendered = 0
+        self.hits = 0
+
+    def _cached(self, key: tuple, render) -> Sprite:
+        with self._lock:
+            spr = self._sprites.get(key)
+            if spr is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return spr
+        spr = render()
+        with self._lock:
+            self.rendered += 1
+            self._sprites[key] = spr
+            if len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
+        METRICS.count("overlay_sprites_rendered")
+        return spr
+
+    @staticmethod
+    def _render_text(text: str, scale: float, color: Color, thickness: int, font: int) -> Sprite:
+        (tw, th), base = cv2.getTextSize(text, font, scale, thickness)
+        pad = thickness
+        h, w = th + base + 2 * pad, tw + 2 * pad
+        mask = np.zeros((h, w), dtype=np.uint8)
+        cv2.putText(mask, text, (pad, pad + th), font, scale, 255, thickness, cv2.LINE_AA)
+        bgr = np.empty((h, w, 3), dtype=np.uint8)
+        bgr[:] = color
+        # anchor = putText's org (baseline-left)
+        return Sprite(bgr, mask, -pad, -(pad + th))
+
+    @staticmethod
+    def _render_banner(text: str, size: Tuple[int, int], text_at: Tuple[int, int], scale: float,
+                       color: Color, bg: Color, thickness: int, font: int) -> Sprite:
+        w, h = size
+        bgr = np.empty((h, w, 3), dtype=np.uint8)
+        bgr[:] = bg
+        cv2.putText(bgr, text, text_at, font, scale, color, thickness, cv2.LINE_AA)
+        return Sprite(bgr, None, 0, 0)
+
+    def _blit(self, img: np.ndarray, spr: Sprite, x: int, y: int) -> None:
+        H, W = img.shape[:2]
+        x0, y0 = x + spr.dx, y + spr.dy
+        ax0, ay0, ax1, ay1 = max(x0, 0), max(y0, 0), min(x0 + spr.w, W), min(y0 + spr.h, H)
+        if ax1 <= ax0 or ay1 <= ay0:
+            return
+        dst = img[ay0:ay1, ax0:ax1]
+        src = (slice(ay0 - y0, ay1 - y0), slice(ax0 - x0, ax1 - x0))
+        if spr.inv is None:
+            dst[:] = spr.bgr[src]
+        else:
+            cv2.multiply(dst, spr.inv[src], dst=dst, scale=1 / 255)
+            cv2.add(dst, spr.premult[src], dst=dst)
+
+    def text(self, img: np.ndarray, text: str, org: Tuple[int, int], scale: float = 0.6,
+             color: Color = (255, 255, 255), thickness: int = 2,
+             font: int = cv2.FONT_HERSHEY_SIMPLEX) -> np.ndarray:
+        """cv2.putText look-alike (same org convention), antialiased and cached per string/style."""
+        key = ("t", text, scale, tuple(color), thickness, font)
+        spr = self._cached(key, lambda: self._render_text(text, scale, tuple(color), thickness, font))
+        self._blit(img, spr, int(org[0]), int(org[1]))
+        return img
+
+    def banner(self, img: np.ndarray, text: str, rect: Tuple[int, int, int, int], text_org: Tuple[int, int],
+               scale: float = 0.8, color: Color = (255, 255, 255), bg: Color = (0, 0, 0),
+               thickness: int = 2, font: int = cv2.FONT_HERSHEY_SIMPLEX) -> np.ndarray:
+        """Filled rect (x0, y0, x1, y1) with text at frame position text_org, as one opaque cached sprite."""
+        x0, y0, x1, y1 = rect
+        size, at = (x1 - x0, y1 - y0), (text_org[0] - x0, text_org[1] - y0)
+        key = ("b", text, size, at, scale, tuple(color), tuple(bg), thickness, font)
+        spr = self._cached(key, lambda: self._render_banner(text, size, at, scale, tuple(color), tuple(bg),
+                                                            thickness, font))
+        self._blit(img, spr, x0, y0)
+        return img
+
+    def landmarks(self, img: np.ndarray, points: Sequence[np.ndarray], color: Color = (0, 255, 0),
+                  radius: int = 3, bone_color: Optional[Color] = (255, 255, 255), bone_thickness: int = 1,
+                  connections: np.ndarray = HAND_CONNECTIONS) -> np.ndarray:
+        """Draw all hands' normalized (21, 2) points and skeleton bones in one vectorized pass."""
+        if len(points) == 0:
+            return img
+        H, W = img.shape[:2]
+        px = (np.asarray(points, dtype=np.float64)[..., :2] * (W, H) + 0.5).astype(np.intp)
+        if bone_color is not None and len(connections):
+            cv2.polylines(img, px[:, connections].reshape(-1, 2, 2).astype(np.int32), False,
+                          bone_color, bone_thickness)
+        # Every point is stamped with a precomputed disk of flat pixel offsets
+        key = (radius, W, H)
+        cached = self._disks.get(key)
+        if cached is None:
+            dy, dx = _disk(radius)
+            cached = self._disks[key] = (dy * W + dx, dy, dx, np.array([W - radius, H - radius]))
+        offsets, dy, dx, lim = cached
+        px = px.reshape(-1, 2)
+        if (px < radius).any() or (px >= lim).any():
+            # Near an edge: drop points outside the frame, pull the rest in so the disk stays inside
+            px = px[((px >= 0) & (px < (W, H))).all(axis=1)]
+            np.clip(px, radius, lim - 1, out=px)
+        if not img.flags.c_contiguous:
+            # reshape() of a strided view (ROI, slice) would be a copy; index rows and columns instead
+            img[(px[:, 1, None] + dy).ravel(), (px[:, 0, None] + dx).ravel()] = color
+            return img
+        flat = (px[:, 1] * W + px[:, 0])[:, None] + offsets
+        img.reshape(-1, img.shape[2])[flat.ravel()] = color
+        return img
+
+OVERLAY = OverlayCompositor()
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+import threading
+import time
+import numpy as np
+import cv2
+
+from src.core.frame_pool import FRAMES, FramePool, readonly
+from src.utils.metrics import METRICS
+
+@dataclass
+class Frame:
+    seq: int
+    image: np.ndarray
+    t_capture: float                      # time.perf_counter() right after cap.read()
+    t_infer_start: float = 0.0
+    t_infer_done: float = 0.0
+    result: Any = None                    # whatever the inference function returned
+    stats: Dict[str, float] = field(default_factory=dict)
+
+    def latency_ms(self, now: Optional[float] = None) -> float:
+        """Capture-to-now latency for this frame."""
+        return ((now if now is not None else time.perf_counter()) - self.t_capture) * 1000.0
+
+    def view(self) -> np.ndarray:
+        """Read-only view of the image for stages that only look at it."""
+        return readonly(self.image)
+
+class DropOldestQueue:
+    """Bounded queue whose put() never blocks: when full, the oldest item is discarded (and passed to on_drop)."""
+    def __init__(self, maxsize: int = 1, on_drop: Optional[Callable[[Any], None]] = None):
+        self._items: Deque = deque(maxlen=max(1, maxsize))
+        self._cv = threading.Condition()
+        self._on_drop = on_drop
+        self.dropped = 0
+        self._closed = False
+
+    def put(self, item) -> None:
+        with self._cv:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                METRICS.count("frames_dropped")
+                if self._on_drop is not None:
+                    self._on_drop(self._items[0])
+            self._items.append(item)
+            self._cv.notify()
+
+    def get(self, timeout: Optional[float] = None):
+        """Return the oldest queued item, or None on timeout/close."""
+        with self._cv:
+            if not self._items and not self._closed:
+                self._cv.wait(timeout=timeout)
+            return self._items.popleft() if self._items else None
+
+    def close(self) -> None:
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+class FramePipeline:
+    """
+    Capture -> inference -> presentation, each on its own schedule.
+      - capture thread: cap.read() (+ optional mirror flip), stamps every frame, never waits on inference
+      - inference thread: runs `infer(frame)` on the freshest captured frame and stores the result
+      - presentation: the caller's thread iterates results() (GUI toolkits want the main thread)
+    Queues between stages hold `queue_size` items and drop the oldest, so a slow stage
+    skips frames instead of working through a backlog of stale ones.
+    Frames are read into recycled `pool` buffers and mirrored in place. A frame's image goes back
+    to the pool when it is dropped or when the caller asks results() for the next frame, so
+    inference and presentation may draw on it but must copy it to keep it longer.
+    """
+    def __init__(
+        self,
+        cap,
+        infer: Callable[[Frame], Any],
+        flip: bool = False,
+        queue_size: int = 1,
+        pool: Optional[FramePool] = None,
+    ):
+        self.cap = cap
+        self.infer = infer
+        self.flip = flip
+        self.pool = pool or FRAMES
+        self.captured = DropOldestQueue(queue_size, on_drop=self._recycle)
+        self.processed = DropOldestQueue(queue_size, on_drop=self._recycle)
+        self._stop = threading.Event()
+        self._threads = []
+        self.error: Optional[BaseException] = None
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        try:
+            # Keep the driver from buffering stale frames behind our back
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception:
+            pass
+
+    def start(self) -> "FramePipeline":
+        for name, fn in (("capture", self._capture_loop), ("inference", self._infer_loop)):
+            t = threading.Thread(target=fn, name=f"pipeline-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.captured.close()
+        self.processed.close()
+        for t in self._threads:
+            t.join(timeout=1.0)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set()
+
+    @property
+    def dropped(self) -> int:
+        return self.captured.dropped + self.processed.dropped
+
+    def _recycle(self, frame: Frame) -> None:
+        self.pool.release(frame.image)
+
+    def buffer_stats(self) -> Dict[str, float]:
+        """Pool counters, plus per-captured-frame averages (steady state: 0 allocations per frame)."""
+        st = self.pool.stats()
+        n = max(1, self.frames_captured)
+        return {**st, "allocations_per_frame": st["allocations"] / n,
+                "bytes_copied_per_frame": st["bytes_copied"] / n}
+
+    def _capture_loop(self) -> None:
+        seq = 0
+        shape = None
+        while not self._stop.is_set():
+            buf = self.pool.acquire(shape) if shape is not None else None
+            ok, img = self.cap.read(buf) if buf is not None else self.cap.read()
+            if not ok:
+                self.pool.release(buf)
+                self.error = RuntimeError("Frame grab failed.")
+                self._stop.set()
+                self.processed.close()
+                break
+            if img is not buf:
+                # First frame, or the driver changed size: it allocated; recycle its array from now on
+                self.pool.release(buf)
+                self.pool.adopt(img)
+                shape = img.shape
+            if self.flip:
+                cv2.flip(img, 1, dst=img)
+            self.captured.put(Frame(seq=seq, image=img, t_capture=time.perf_counter()))
+            self.frames_captured += 1
+            seq += 1
+
+    def _infer_loop(self) -> None:
+        while not self._stop.is_set():
+            frame = self.captured.get(timeout=0.1)
+            if frame is None:
+                continue
+            frame.t_infer_start = time.perf_counter()
+            try:
+                frame.result = self.infer(frame)
+            except Exception as e:
+                self.error = e
+                self._stop.set()
+                self.processed.close()
+                break
+            frame.t_infer_done = time.perf_counter()
+            frame.stats["queue_ms"] = (frame.t_infer_start - frame.t_capture) * 1000.0
+            frame.stats["infer_ms"] = (frame.t_infer_done - frame.t_infer_start) * 1000.0
+            self.frames_inferred += 1
+            self.processed.put(frame)
+
+    def results(self, timeout: float = 0.5) -> Iterator[Frame]:
+        """Yield processed frames until stopped (check `.error` afterwards); stamps stats['e2e_ms']."""
+        prev: Optional[Frame] = None
+        try:
+            while self.running or len(self.processed):
+                frame = self.processed.get(timeout=timeout)
+                if frame is None:
+                    continue
+                if prev is not None:
+                    self._recycle(prev)
+                frame.stats["e2e_ms"] = frame.latency_ms()
+                prev = frame
+                yield frame
+        finally:
+            if prev is not None:
+                self._recycle(prev)
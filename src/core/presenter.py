@@ -0,0 +1,93 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Optional
+import time
+import numpy as np
+import cv2
+
+from src.core.frame_pool import FRAMES
+from src.utils.metrics import METRICS
+
+class FramePublisher:
+    """
+    Rate-limited preview publishing, decoupled from the inference rate.
+      - due() is True at most `fps` times per second; frames in between are not published at all,
+        so callers can also skip drawing their HUD on them
+      - publish() downscales to `max_width` into a reused buffer, JPEG-encodes once and hands the
+        bytes to `sink` (e.g. an st.image placeholder), so UI bandwidth is capped by fps x JPEG size
+    fps <= 0 publishes every frame.
+    """
+    def __init__(self, sink: Callable[[bytes], Any], fps: float = 15.0, max_width: int = 640, quality: int = 80):
+        self.sink = sink
+        self.fps = fps
+        self.max_width = max_width
+        self.quality = quality
+        self._params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self._next = 0.0
+        self._dst: Dict[str, np.ndarray] = {}
+        self.published = 0
+        self.skipped = 0
+        self.bytes_published = 0
+
+    def due(self, now: Optional[float] = None) -> bool:
+        now = time.perf_counter() if now is None else now
+        if now < self._next:
+            self.skipped += 1
+            METRICS.count("ui_frames_skipped")
+            return False
+        # Keep a steady cadence, but restart it after a stall instead of bursting to catch up
+        period = 1.0 / self.fps if self.fps > 0 else 0.0
+        self._next = self._next + period if now - self._next < period else now + period
+        return True
+
+    def encode(self, img: np.ndarray) -> bytes:
+        h, w = img.shape[:2]
+        if self.max_width and w > self.max_width:
+            size = (self.max_width, max(1, round(h * self.max_width / w)))
+            small = FRAMES.dst(self._dst, "small", (size[1], size[0]) + img.shape[2:], img.dtype)
+            img = cv2.resize(img, size, dst=small, interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode(".jpg", img, self._params)
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf.tobytes()
+
+    def publish(self, img: np.ndarray) -> int:
+        """Encode and send one frame; returns the JPEG size in bytes."""
+        with METRICS.timer("ui.publish"):
+            data = self.encode(img)
+            self.sink(data)
+        self.published += 1
+        self.bytes_published += len(data)
+        METRICS.count("ui_frames_published")
+        METRICS.count("ui_bytes_published", len(data))
+        return len(data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fps": self.fps,
+            "published": self.published,
+            "skipped": self.skipped,
+            "bytes_published": self.bytes_published,
+            "mean_jpeg_bytes": self.bytes_published // self.published if self.published else 0,
+        }
+
+class WidgetCache:
+    """
+    Skips widget updates that would not change anything: update(key, fn, *args) calls fn(*args)
+    only when args differ from the last ones sent under `key`.
+    """
+    def __init__(self):
+        self._last: Dict[str, tuple] = {}
+        self.updates = 0
+        self.skipped = 0
+
+    def update(self, key: str, fn: Callable[..., Any], *args) -> bool:
+        if self._last.get(key) == args:
+            self.skipped += 1
+            return False
+        fn(*args)
+        self._last[key] = args
+        self.updates += 1
+        return True
+
+    def reset(self) -> None:
+        self._last.clear()
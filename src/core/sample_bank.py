@@ -0,0 +1,102 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+import glob
+import os
+import wave
+import numpy as np
+
+_FADE_MS = 10.0
+
+def _decode_wav(path: str) -> Tuple[np.ndarray, int]:
+    """Decode a PCM WAV into float32 (frames, channels) in [-1, 1] plus its sample rate."""
+    with wave.open(path, 'rb') as wf:
+        sr = wf.getframerate()
+        ch = wf.getnchannels()
+        width = wf.getsampwidth()
+        raw = wf.readframes(wf.getnframes())
+    if width == 1:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        data = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 4:
+        data = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width {width} in {path}")
+    return data.reshape(-1, ch), sr
+
+class SampleBank:
+    """
+    All note WAVs of a folder decoded once into one contiguous float32 block.
+      - samples are padded to a common length: shape (n_notes, max_frames, channels)
+      - mix() sums any set of notes in a single vectorized pass and returns int16 PCM
+      - mixes are memoized per (notes, frames, gain) since the same chords repeat all session
+    Files whose sample rate differs from the first one loaded are skipped.
+    """
+    def __init__(self, folder: str, channels: int = 2, max_cache: int = 64):
+        self.folder = folder
+        self.channels = channels
+        self.sample_rate: Optional[int] = None
+        self.note_index: Dict[str, int] = {}
+        self._cache: Dict[Tuple, np.ndarray] = {}
+        self._max_cache = max_cache
+
+        decoded: List[np.ndarray] = []
+        for path in sorted(glob.glob(os.path.join(folder, "*.wav"))):
+            try:
+                data, sr = _decode_wav(path)
+            except Exception as e:
+                print(f"Warning: could not decode {path}: {e}")
+                continue
+            if self.sample_rate is None:
+                self.sample_rate = sr
+            elif sr != self.sample_rate:
+                print(f"Warning: {path} is {sr} Hz, bank is {self.sample_rate} Hz; skipped.")
+                continue
+            if data.shape[1] != channels:
+                data = np.repeat(data.mean(axis=1, keepdims=True), channels, axis=1)
+            self.note_index[os.path.splitext(os.path.basename(path))[0]] = len(decoded)
+            decoded.append(data)
+
+        max_len = max((d.shape[0] for d in decoded), default=0)
+        self.lengths = np.array([d.shape[0] for d in decoded], dtype=np.int64)
+        self.data = np.zeros((len(decoded), max_len, channels), dtype=np.float32)
+        for i, d in enumerate(decoded):
+            self.data[i, :d.shape[0]] = d
+
+    def __contains__(self, note: str) -> bool:
+        return note in self.note_index
+
+    def __len__(self) -> int:
+        return len(self.note_index)
+
+    def _sum(self, idx: List[int], frames: int) -> np.ndarray:
+        return self.data[idx, :frames].sum(axis=0)
+
+    def mix(self, notes: Sequence[str], dur: Optional[float] = None, gain: Optional[float] = None) -> np.ndarray:
+        """Mix `notes` into one int16 buffer of shape (frames, channels), trimmed to `dur` seconds with a short fade."""
+        idx = [self.note_index[n] for n in notes if n in self.note_index]
+        if not idx or self.sample_rate is None:
+            return np.zeros((0, self.channels), dtype=np.int16)
+        frames = int(self.lengths[idx].max())
+        if dur is not None:
+            frames = min(frames, max(1, int(dur * self.sample_rate)))
+        if gain is None:
+            # ~3 dB headroom per doubling of voices keeps chords loud without hard clipping
+            gain = 1.0 / np.sqrt(len(idx))
+        key = (tuple(sorted(idx)), frames, round(float(gain), 4))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        buf = self._sum(idx, frames)
+        buf *= gain
+        fade = min(frames, int(self.sample_rate * _FADE_MS / 1000.0))
+        if fade > 1 and dur is not None:
+            buf[-fade:] *= np.linspace(1.0, 0.0, fade, dtype=np.float32)[:, None]
+        np.clip(buf, -1.0, 32767.0 / 32768.0, out=buf)
+        out = np.ascontiguousarray((buf * 32768.0).astype(np.int16))
+
+        if len(self._cache) >= self._max_cache:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = out
+        return out
@@ -0,0 +1,104 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+
+NO_LABEL = ""
+
+@dataclass
+class LabelEvent:
+    label: str          # new stable label ("" when no gesture is stable)
+    confidence: float   # mean classifier confidence of `label` over the window
+    previous: str
+    frame: int          # index of the frame that triggered the transition
+
+class LabelSmoother:
+    """
+    Temporal voting between the classifier and the modes.
+      - last `window` labels live in a fixed-size int ring buffer; per-label tallies update in O(1)
+      - mode="majority": a label's share is its count / window
+      - mode="weighted": a label's share is its summed confidence / window
+      - hysteresis: a label becomes stable at share >= enter, and stays stable until share < exit
+    Shares use the full window size, so a label needs ~enter*window frames before it can win.
+    update() returns a LabelEvent only when the stable label changes, otherwise None.
+    """
+    def __init__(self, window: int = 7, mode: str = "majority", enter: float = 0.6, exit: float = 0.4):
+        if mode not in ("majority", "weighted"):
+            raise ValueError(f"Unknown smoothing mode: {mode}")
+        if not 0.0 < exit <= enter <= 1.0:
+            raise ValueError("Require 0 < exit <= enter <= 1.")
+        self.window = int(window)
+        self.mode = mode
+        self.enter = enter
+        self.exit = exit
+
+        self._ids = np.zeros(self.window, dtype=np.int32)
+        self._conf = np.zeros(self.window, dtype=np.float32)
+        self._label_to_id: Dict[str, int] = {NO_LABEL: 0}
+        self._labels: List[str] = [NO_LABEL]
+        self._counts: List[int] = [0]
+        self._weights: List[float] = [0.0]
+        self.reset()
+
+    def reset(self) -> None:
+        self._pos = 0
+        self._filled = 0
+        self._counts = [0] * len(self._labels)
+        self._weights = [0.0] * len(self._labels)
+        self._stable = 0
+        self._frame = 0
+
+    @property
+    def label(self) -> str:
+        return self._labels[self._stable]
+
+    @property
+    def confidence(self) -> float:
+        c = self._counts[self._stable]
+        return self._weights[self._stable] / c if c else 0.0
+
+    def _id(self, label: str) -> int:
+        i = self._label_to_id.get(label)
+        if i is None:
+            i = len(self._labels)
+            self._label_to_id[label] = i
+            self._labels.append(label)
+            self._counts.append(0)
+            self._weights.append(0.0)
+        return i
+
+    def _share(self, i: int) -> float:
+        if self.mode == "majority":
+            return self._counts[i] / self.window
+        return self._weights[i] / self.window
+
+    def update(self, label: str, confidence: float) -> Optional[LabelEvent]:
+        i = self._id(label or NO_LABEL)
+        conf = float(confidence)
+        p = self._pos
+        if self._filled == self.window:
+            old = self._ids[p]
+            old_w = float(self._conf[p])
+            self._counts[old] -= 1
+            self._weights[old] -= old_w
+        else:
+            self._filled += 1
+        self._ids[p] = i
+        self._conf[p] = conf
+        self._counts[i] += 1
+        self._weights[i] += float(self._conf[p])
+        self._pos = (p + 1) % self.window
+        self._frame += 1
+
+        best = max(range(len(self._counts)), key=self._counts.__getitem__) if self.mode == "majority" \
+            else max(range(len(self._weights)), key=self._weights.__getitem__)
+        new = self._stable
+        if best != self._stable and self._share(best) >= self.enter:
+            new = best
+        elif self._stable != 0 and self._share(self._stable) < self.exit:
+            new = 0
+        if new == self._stable:
+            return None
+        prev = self._labels[self._stable]
+        self._stable = new
+        return LabelEvent(label=self.label, confidence=self.confidence, previous=prev, frame=self._frame)
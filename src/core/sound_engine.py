@@ -1,5 +1,9 @@
 from typing import List, Optional
-import time
+
+from src.core.voice_scheduler import VoiceScheduler
+from src.core.sample_bank import SampleBank
+from src.core.synth import SynthBank
+from src.utils.metrics import METRICS, timed
 
 # Try MIDI via pygame; otherwise fall back to simpleaudio WAV playback.
 try:
@@ -18,10 +22,13 @@ NOTE_TO_MIDI = {
     # Basic octave mapping
     'C4': 60, 'D4': 62, 'E4': 64, 'F4': 65, 'G4': 67, 'A4': 69, 'B4': 71,
     'C5': 72, 'D5': 74, 'E5': 76,
+    # Bass notes of the two-handed composite labels
+    'G2': 43, 'C3': 48, 'D3': 50, 'E3': 52, 'F#3': 54, 'G3': 55, 'A3': 57,
 }
 
 class SoundEngine:
-    def __init__(self, wav_folder: Optional[str] = None):
+    def __init__(self, wav_folder: Optional[str] = None, polyphony: int = 16,
+                 synth_cache_dir: str = "data/synth_cache"):
         self.wav_folder = wav_folder
         self.midi_out = None
         if _MIDI_AVAILABLE:
@@ -31,30 +38,58 @@ class SoundEngine:
             except Exception:
                 self.midi_out = None
 
-    def play_notes(self, notes: List[str], dur: float = 0.5, velocity: int = 90):
+        # Note-offs run on a background timer so play_notes() never blocks the frame loop
+        self.voices: Optional[VoiceScheduler] = None
+        self.bank: Optional[SampleBank] = None
         if self.midi_out is not None:
-            # MIDI chord
-            for n in notes:
-                midi_num = NOTE_TO_MIDI.get(n, 60)
-                self.midi_out.note_on(midi_num, velocity)
-            time.sleep(dur)
-            for n in notes:
-                midi_num = NOTE_TO_MIDI.get(n, 60)
-                self.midi_out.note_off(midi_num, velocity)
-        elif _SA_AVAILABLE and self.wav_folder:
-            # very simple sequential WAV playback
-            for n in notes:
-                try:
-                    wave = sa.WaveObject.from_wave_file(f"{self.wav_folder}/{n}.wav")
-                    play = wave.play()
-                    play.wait_done()
-                except Exception:
-                    pass
-        else:
+            self.voices = VoiceScheduler(self._midi_on, self._midi_off, max_voices=polyphony)
+        elif _SA_AVAILABLE:
+            # Decode every WAV once (or load the synthesized cache); chords play as one buffer
+            try:
+                self.bank = SampleBank(self.wav_folder) if self.wav_folder else SynthBank(cache_dir=synth_cache_dir)
+            except Exception as e:
+                print(f"Warning: audio bank unavailable: {e}")
+            if self.bank is not None and len(self.bank):
+                self.voices = VoiceScheduler(self._wav_on, self._wav_off, max_voices=polyphony)
+
+    def _midi_on(self, midi_num: int, velocity: int):
+        self.midi_out.note_on(midi_num, velocity)
+
+    def _midi_off(self, midi_num: int, handle) -> None:
+        self.midi_out.note_off(midi_num, 0)
+
+    def _wav_on(self, chord, velocity: int):
+        notes, dur = chord
+        pcm = self.bank.mix(notes, dur=dur, gain=(velocity / 127.0) / max(1, len(notes)) ** 0.5)
+        if not len(pcm):
+            return None
+        return sa.play_buffer(pcm, self.bank.channels, 2, self.bank.sample_rate)
+
+    def _wav_off(self, chord, play) -> None:
+        if play is not None:
+            play.stop()
+
+    @timed("sound.play_notes")
+    def play_notes(self, notes: List[str], dur: float = 0.5, velocity: int = 90):
+        """Start `notes` now and schedule their release after `dur` seconds. Returns immediately."""
+        METRICS.count("audio_triggers")
+        if self.voices is None:
             # Fallback: no audio backend — simulate with print
             print(f"[SOUND] {notes} for {dur:.2f}s" )
+            return
+        if self.bank is not None:
+            # One voice per chord: the mixed buffer already holds every note
+            self.voices.trigger((tuple(notes), dur), dur, velocity)
+            return
+        for n in notes:
+            self.voices.trigger(NOTE_TO_MIDI.get(n, 60), dur, velocity)
+
+    def active_voices(self) -> List:
+        return self.voices.active_voices() if self.voices is not None else []
 
     def close(self):
+        if self.voices is not None:
+            self.voices.close()
         if self.midi_out is not None:
             self.midi_out.close()
             try:
@@ -0,0 +1,121 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import numpy as np
+
+from src.core.sample_bank import SampleBank
+from src.utils.mappings import HAND_LABELS, LABEL_TO_NOTES
+
+_PITCH_CLASS = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+def note_to_midi(name: str) -> int:
+    """'C4' -> 60, 'F#4' -> 66, 'Bb3' -> 58."""
+    letter, rest = name[0].upper(), name[1:]
+    semis = _PITCH_CLASS[letter]
+    while rest and rest[0] in "#b":
+        semis += 1 if rest[0] == "#" else -1
+        rest = rest[1:]
+    return 12 * (int(rest) + 1) + semis
+
+def adsr_envelope(frames: int, sr: int, attack: float, decay: float, sustain: float, release: float) -> np.ndarray:
+    """Piecewise-linear ADSR over `frames` samples; release occupies the tail."""
+    a = min(frames, int(attack * sr))
+    d = min(frames - a, int(decay * sr))
+    r = min(frames - a - d, int(release * sr))
+    s = frames - a - d - r
+    return np.concatenate([
+        np.linspace(0.0, 1.0, a, endpoint=False, dtype=np.float32),
+        np.linspace(1.0, sustain, d, endpoint=False, dtype=np.float32),
+        np.full(s, sustain, dtype=np.float32),
+        np.linspace(sustain, 0.0, r, dtype=np.float32),
+    ])
+
+def render_notes(midi_nums: Sequence[int], sr: int, dur: float,
+                 harmonics: Sequence[float], adsr: Tuple[float, float, float, float]) -> np.ndarray:
+    """Additive synthesis for all notes at once -> float32 (n_notes, frames), peak <= 1."""
+    frames = int(dur * sr)
+    t = np.arange(frames, dtype=np.float64) / sr
+    freqs = 440.0 * 2.0 ** ((np.asarray(midi_nums, dtype=np.float64) - 69.0) / 12.0)
+    amps = np.asarray(harmonics, dtype=np.float64)
+    partials = np.arange(1, len(amps) + 1, dtype=np.float64)
+    # (n, k, 1) * (1, 1, frames) phases; weighted sum over the k partials
+    phase = 2.0 * np.pi * (freqs[:, None, None] * partials[None, :, None]) * t[None, None, :]
+    wave = np.einsum('nkf,k->nf', np.sin(phase), amps) / amps.sum()
+    env = adsr_envelope(frames, sr, *adsr)
+    return (wave * env[None, :]).astype(np.float32)
+
+class SynthBank(SampleBank):
+    """
+    Built-in synthesizer used when there is no MIDI device and no WAV folder.
+    Every note in NOTE_TO_MIDI and LABEL_TO_NOTES, plus every single-hand label's chord sum, is rendered
+    once and saved to `cache_dir` as a .npy keyed by sample rate and timbre; later startups
+    memory-map that file instead of rendering.
+    """
+    def __init__(
+        self,
+        notes: Optional[Iterable[str]] = None,
+        sample_rate: int = 44100,
+        dur: float = 1.5,
+        harmonics: Sequence[float] = (1.0, 0.5, 0.25, 0.125),
+        adsr: Tuple[float, float, float, float] = (0.01, 0.15, 0.6, 0.3),
+        amplitude: float = 0.5,
+        cache_dir: str = "data/synth_cache",
+        max_cache: int = 64,
+    ):
+        from src.core.sound_engine import NOTE_TO_MIDI
+        names = set(notes) if notes is not None else set(NOTE_TO_MIDI)
+        for chord in LABEL_TO_NOTES.values():
+            names.update(chord)
+        self.note_names: List[str] = sorted(names, key=lambda n: (note_to_midi(n), n))
+        # Two-handed composites are bass + one of these chords and are mixed on demand
+        self.chord_keys: List[Tuple[str, ...]] = sorted({tuple(sorted(LABEL_TO_NOTES[lbl])) for lbl in HAND_LABELS
+                                                         if len(LABEL_TO_NOTES[lbl]) > 1})
+
+        self.folder = cache_dir
+        self.channels = 1
+        self.sample_rate = sample_rate
+        self._cache: Dict[Tuple, np.ndarray] = {}
+        self._max_cache = max_cache
+        self.note_index = {n: i for i, n in enumerate(self.note_names)}
+        self.chord_rows: Dict[Tuple[int, ...], int] = {
+            tuple(sorted(self.note_index[n] for n in c)): len(self.note_names) + j
+            for j, c in enumerate(self.chord_keys)
+        }
+
+        params = {
+            "sr": sample_rate, "dur": dur, "harmonics": list(harmonics), "adsr": list(adsr), "amp": amplitude,
+            "notes": self.note_names, "chords": [list(c) for c in self.chord_keys],
+        }
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+        self.cache_path = os.path.join(cache_dir, f"synth_{sample_rate}_{digest}.npy")
+        self.data = self._load_or_render(dur, harmonics, adsr, amplitude)
+        self.lengths = np.full(len(self.note_names), self.data.shape[1], dtype=np.int64)
+
+    def _load_or_render(self, dur, harmonics, adsr, amplitude) -> np.ndarray:
+        if os.path.exists(self.cache_path):
+            try:
+                return np.load(self.cache_path, mmap_mode='r')
+            except Exception:
+                pass
+        notes = render_notes([note_to_midi(n) for n in self.note_names], self.sample_rate, dur, harmonics, adsr)
+        notes *= amplitude
+        chords = np.stack([notes[list(k)].sum(axis=0) for k in self.chord_rows]) if self.chord_rows \
+            else np.zeros((0, notes.shape[1]), dtype=np.float32)
+        block = np.concatenate([notes, chords])[:, :, None]
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp = self.cache_path + ".tmp.npy"
+            np.save(tmp, block)
+            os.replace(tmp, self.cache_path)
+            return np.load(self.cache_path, mmap_mode='r')
+        except OSError as e:
+            print(f"Warning: could not write synth cache {self.cache_path}: {e}")
+            return block
+
+    def _sum(self, idx: List[int], frames: int) -> np.ndarray:
+        row = self.chord_rows.get(tuple(sorted(idx)))
+        if row is not None:
+            return np.array(self.data[row, :frames], dtype=np.float32)
+        return super()._sum(idx, frames)
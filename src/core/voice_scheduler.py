@@ -0,0 +1,116 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List
+import heapq
+import itertools
+import threading
+import time
+
+@dataclass(order=True)
+class Voice:
+    off_at: float
+    seq: int
+    key: Hashable = field(compare=False)
+    velocity: int = field(compare=False, default=90)
+    started_at: float = field(compare=False, default=0.0)
+    handle: Any = field(compare=False, default=None)
+    released: bool = field(compare=False, default=False)
+
+class VoiceScheduler:
+    """
+    Background note-off timer so callers never block on audio.
+      - note_on is sent immediately from the caller's thread
+      - note_off is queued and fired by a daemon thread when the voice expires
+      - a new voice beyond `max_voices` steals the oldest sounding one
+      - re-triggering a key that is already sounding restarts that voice
+    `note_on(key, velocity)` may return a handle; it is passed back to `note_off(key, handle)`.
+    """
+    def __init__(
+        self,
+        note_on: Callable[[Hashable, int], Any],
+        note_off: Callable[[Hashable, Any], None],
+        max_voices: int = 16,
+    ):
+        self._note_on = note_on
+        self._note_off = note_off
+        self.max_voices = max(1, int(max_voices))
+
+        self._heap: List[Voice] = []
+        self._active: Dict[Hashable, Voice] = {}
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._closed = False
+        self.stolen = 0
+
+        self._thread = threading.Thread(target=self._run, name="voice-scheduler", daemon=True)
+        self._thread.start()
+
+    def trigger(self, key: Hashable, dur: float, velocity: int = 90) -> None:
+        now = time.monotonic()
+        with self._cv:
+            if self._closed:
+                return
+            prev = self._active.pop(key, None)
+            if prev is not None:
+                self._release(prev)
+            while len(self._active) >= self.max_voices:
+                oldest = min(self._active.values(), key=lambda v: v.started_at)
+                del self._active[oldest.key]
+                self._release(oldest)
+                self.stolen += 1
+            try:
+                handle = self._note_on(key, velocity)
+            except Exception:
+                return
+            voice = Voice(off_at=now + max(0.0, dur), seq=next(self._seq), key=key,
+                          velocity=velocity, started_at=now, handle=handle)
+            self._active[key] = voice
+            heapq.heappush(self._heap, voice)
+            self._cv.notify()
+
+    def active_voices(self) -> List[Hashable]:
+        with self._cv:
+            return [v.key for v in sorted(self._active.values(), key=lambda v: v.started_at)]
+
+    def release_all(self) -> None:
+        with self._cv:
+            for v in list(self._active.values()):
+                self._release(v)
+            self._active.clear()
+            self._heap.clear()
+
+    def close(self) -> None:
+        self.release_all()
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+        self._thread.join(timeout=1.0)
+
+    def _release(self, voice: Voice) -> None:
+        # Caller holds the lock. Stale heap entries are skipped later via `released`.
+        if voice.released:
+            return
+        voice.released = True
+        try:
+            self._note_off(voice.key, voice.handle)
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        with self._cv:
+            while not self._closed:
+                if not self._heap:
+                    self._cv.wait()
+                    continue
+                head = self._heap[0]
+                if head.released:
+                    heapq.heappop(self._heap)
+                    continue
+                delay = head.off_at - time.monotonic()
+                if delay > 0:
+                    self._cv.wait(timeout=delay)
+                    continue
+                heapq.heappop(self._heap)
+                if self._active.get(head.key) is head:
+                    del self._active[head.key]
+                self._release(head)
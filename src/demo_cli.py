@@ -1,43 +1,82 @@
 import cv2, time
 import numpy as np
 from src.core.hand_tracking import HandTracker
-from src.utils.features import extract_features
+from src.core.multi_hand import MultiHandRecognizer
+from src.core.overlay import OVERLAY
+from src.core.pipeline import FramePipeline
+from src.utils.recording import LandmarkRecorder
+
+# Number keys pick the label being recorded; 'r' toggles recording, 'q' quits
+RECORD_KEYS = {ord(str(i + 1)): lbl for i, lbl in enumerate(["NOTE_C4", "NOTE_D4", "NOTE_E4", "C_CHORD", "G_CHORD"])}
 
 # Optional: a stub classifier that returns a constant label
 class _StubClassifier:
     def predict_label(self, x):
         return ("NOTE_C4", 0.7)
 
-def main():
-    tracker = HandTracker(max_hands=1)
+    def predict_labels(self, X):
+        return [("NOTE_C4", 0.7)] * len(X)
+
+def main(record_dir: str = "data/gestures/store", max_hands: int = 1):
+    tracker = HandTracker(max_hands=max_hands, roi=True)
     clf = _StubClassifier()  # replace with a real loaded model
+    # All hands in one batched call; with two hands the labels combine into a composite
+    recognizer = MultiHandRecognizer(clf)
     cap = cv2.VideoCapture(0)
     if not cap.isOpened():
         print("Could not open webcam.")
         return
-    last_ts = time.time()
-    while True:
-        ok, frame = cap.read()
-        if not ok:
-            break
-        hands = tracker.process(frame)
-        frame_drawn = tracker.draw(frame.copy(), hands)
 
+    def infer(frame):
+        hands = tracker.process(frame.view())
+        pred = None
         if hands:
-            feats = extract_features(hands[0].points)["vector"]
-            label, conf = clf.predict_label(feats)
-            dt_ms = int((time.time() - last_ts) * 1000)
-            last_ts = time.time()
-            cv2.putText(frame_drawn, f"Pred: {label} ({conf:.2f})  dt={dt_ms}ms", (10, 60),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,255), 2)
+            pred = recognizer.predict(hands)
+        return hands, pred
+
+    recorder = None
+    rec_label = RECORD_KEYS[ord("1")]
+    session = time.strftime("cli-%Y%m%d-%H%M%S")
+    # t_capture is perf_counter(); one offset maps it to the wall-clock ms the store uses
+    wall_offset_ms = time.time() * 1000.0 - time.perf_counter() * 1000.0
+
+    # Mirrored (selfie) view like app.py: MediaPipe handedness, and so the composite labels' bass hand, assume it
+    pipe = FramePipeline(cap, infer, flip=True).start()
+    try:
+        for frame in pipe.results():
+            hands, pred = frame.result
+            if recorder is not None:
+                recorder.append(hands, label=rec_label, session=session,
+                                t_ms=wall_offset_ms + frame.t_capture * 1000.0)
+            # Inference is done with this frame; draw straight onto its (pooled) buffer
+            frame_drawn = tracker.draw(frame.image, hands)
+
+            if pred is not None:
+                label, conf = pred
+                OVERLAY.text(frame_drawn, f"Pred: {label} ({conf:.2f})  e2e={frame.stats['e2e_ms']:.0f}ms", (10, 60),
+                             0.6, (0,255,255), 2)
 
-        cv2.imshow("Guided Piano — Demo", frame_drawn)
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
+            if recorder is not None:
+                OVERLAY.text(frame_drawn, f"REC {rec_label}", (10, 90), 0.6, (0,0,255), 2)
 
-    cap.release()
-    cv2.destroyAllWindows()
+            cv2.imshow("Guided Piano — Demo", frame_drawn)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key in RECORD_KEYS:
+                rec_label = RECORD_KEYS[key]
+            elif key == ord('r'):
+                if recorder is None:
+                    recorder = LandmarkRecorder(record_dir)
+                else:
+                    recorder.close()
+                    recorder = None
+    finally:
+        if recorder is not None:
+            recorder.close()
+        pipe.stop()
+        cap.release()
+        cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -7,6 +7,8 @@ except Exception as e:
     raise ImportError("cvzone is required for this demo. Install with `pip install cvzone`.") from e
 
 from src.core.sound_engine import SoundEngine
+from src.core.overlay import OVERLAY
+from src.core.pipeline import FramePipeline
 
 # MIDI note numbers for D major scale chords
 # Thumb-> D major (D F# A) ; Index-> E minor (E G B); Middle-> F# minor (F# A C#);
@@ -39,22 +41,23 @@ def main():
     # Track which finger chord is currently sounding and when it started
     active = {}  # finger_index -> (start_time, notes)
 
+    def infer(frame):
+        """Inference thread: detect hands, draw them, and collect raised finger indices."""
+        hands, img = detector.findHands(frame.image, draw=True)
+        raised = set()
+        if hands:
+            for hand in hands:
+                fingers = detector.fingersUp(hand)  # [thumb..pinky] list of 0/1
+                for fi, up in enumerate(fingers):
+                    if up: raised.add(fi)
+        return raised, img
+
+    pipe = FramePipeline(cap, infer, flip=True).start()
     try:
-        while True:
-            ok, img = cap.read()
-            if not ok: break
-            img = cv2.flip(img, 1)
-
-            hands, img = detector.findHands(img, draw=True)
+        for frame in pipe.results():
+            raised, img = frame.result
             now = time.time()
 
-            raised = set()
-            if hands:
-                for hand in hands:
-                    fingers = detector.fingersUp(hand)  # [thumb..pinky] list of 0/1
-                    for fi, up in enumerate(fingers):
-                        if up: raised.add(fi)
-
             # Start chords for newly raised fingers
             for fi in raised:
                 if fi not in active and fi in FINGER_TO_NOTES:
@@ -69,14 +72,14 @@ def main():
                     # Here we simply drop from active; SoundEngine stops after 'dur' anyway.
                     del active[fi]
 
-            cv2.putText(img, f"Raised: {sorted(list(raised))}", (10, 40),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,255,255), 2)
+            OVERLAY.text(img, f"Raised: {sorted(list(raised))}", (10, 40), 0.8, (0,255,255), 2)
             cv2.imshow("Guided Piano — cvzone demo (D major chords)", img)
 
             if (cv2.waitKey(1) & 0xFF) == ord('q'):
                 break
 
     finally:
+        pipe.stop()
         cap.release()
         cv2.destroyAllWindows()
         sound.close()
@@ -0,0 +1,189 @@
+"""
+Turn a folder of labeled gesture videos into landmark shards for training.
+
+Labels come from the video's parent folder (videos/NOTE_C4/take1.mp4) or, for flat folders,
+from the filename prefix before "__" (videos/NOTE_C4__take1.mp4).
+
+    python -m src.extract_dataset videos/ --out data/gestures --workers 8
+
+Each video is written as <label>__<stem>.<k>.npz shards of `--shard-frames` frames, followed by a
+<label>__<stem>.done.json marker. Re-running skips finished videos and resumes partial ones at
+their first missing shard.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import glob
+import json
+import os
+import time
+import numpy as np
+import cv2
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+HANDEDNESS_TO_ID = {"Left": 0, "Right": 1}
+
+_tracker = None  # one HandTracker (MediaPipe graph) per worker process
+
+def _init_worker(max_hands: int, detection_conf: float) -> None:
+    global _tracker
+    from src.core.hand_tracking import HandTracker
+    _tracker = HandTracker(max_hands=max_hands, detection_conf=detection_conf)
+
+def find_videos(root: str) -> List[Tuple[str, str]]:
+    """Return sorted (path, label) pairs for every video under `root`."""
+    out = []
+    for path in sorted(glob.glob(os.path.join(root, "**", "*"), recursive=True)):
+        if not path.lower().endswith(VIDEO_EXTS):
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        parent = os.path.relpath(os.path.dirname(path), root)
+        if parent != ".":
+            label = os.path.basename(parent)
+        elif "__" in stem:
+            label = stem.split("__", 1)[0]
+        else:
+            continue
+        out.append((path, label))
+    return out
+
+def shard_prefix(out_dir: str, path: str, label: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem.startswith(label + "__"):
+        stem = stem[len(label) + 2:]
+    return os.path.join(out_dir, f"{label}__{stem}")
+
+# In-progress shard; np.savez needs the .npz ending, so readers must skip these explicitly
+TMP_SUFFIX = ".tmp.npz"
+
+def _write_shard(path: str, label: str, rows: Dict[str, list], n_frames: int) -> None:
+    tmp = path + TMP_SUFFIX
+    np.savez_compressed(
+        tmp,
+        label=np.asarray(label),
+        n_frames=np.asarray(n_frames, dtype=np.int32),
+        frame_idx=np.asarray(rows["frame_idx"], dtype=np.int32),
+        t_ms=np.asarray(rows["t_ms"], dtype=np.float64),
+        points=np.asarray(rows["points"], dtype=np.float32).reshape(-1, 21, 2),
+        handedness=np.asarray(rows["handedness"], dtype=np.int8),
+        score=np.asarray(rows["score"], dtype=np.float32),
+    )
+    os.replace(tmp, path)
+
+def extract_video(path: str, label: str, out_dir: str, shard_frames: int) -> Dict:
+    """Worker task: run the tracker over one video and write its shards. Returns a stats dict."""
+    prefix = shard_prefix(out_dir, path, label)
+    done_path = prefix + ".done.json"
+    if os.path.exists(done_path):
+        with open(done_path, encoding="utf-8") as f:
+            return {**json.load(f), "skipped": True}
+
+    # Resume at the first missing shard
+    k = 0
+    while os.path.exists(f"{prefix}.{k:04d}.npz"):
+        k += 1
+    start_frame = k * shard_frames
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return {"video": path, "error": "could not open", "pid": os.getpid()}
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    rows = {"frame_idx": [], "t_ms": [], "points": [], "handedness": [], "score": []}
+    frame_idx = start_frame
+    in_shard = 0
+    n_hands = 0
+    t0 = time.perf_counter()
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        t_ms = cap.get(cv2.CAP_PROP_POS_MSEC) or frame_idx * 1000.0 / fps
+        for hand in _tracker.process(frame):
+            rows["frame_idx"].append(frame_idx)
+            rows["t_ms"].append(t_ms)
+            rows["points"].append(hand.points)
+            rows["handedness"].append(HANDEDNESS_TO_ID.get(hand.handedness, -1))
+            rows["score"].append(hand.score)
+            n_hands += 1
+        frame_idx += 1
+        in_shard += 1
+        if in_shard == shard_frames:
+            _write_shard(f"{prefix}.{k:04d}.npz", label, rows, in_shard)
+            rows = {key: [] for key in rows}
+            in_shard = 0
+            k += 1
+    if in_shard:
+        _write_shard(f"{prefix}.{k:04d}.npz", label, rows, in_shard)
+        k += 1
+    cap.release()
+
+    seconds = time.perf_counter() - t0
+    stats = {
+        "video": path, "label": label, "shards": k, "frames": frame_idx - start_frame,
+        "hands": n_hands, "seconds": round(seconds, 3), "pid": os.getpid(),
+    }
+    with open(done_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+    return stats
+
+def iter_shards(folder: str) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield the arrays of every landmark shard in `folder` (one dict per shard)."""
+    for path in sorted(glob.glob(os.path.join(folder, "*.npz"))):
+        if path.endswith(TMP_SUFFIX):
+            continue  # left behind by an interrupted extraction
+        with np.load(path) as z:
+            if "points" not in z:
+                continue
+            yield {key: z[key] for key in z.files}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Extract hand landmarks from labeled videos in parallel.")
+    ap.add_argument("videos", help="Folder of videos: <label>/<name>.mp4 or <label>__<name>.mp4")
+    ap.add_argument("--out", default="data/gestures", help="Output folder for .npz shards")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--shard-frames", type=int, default=3000, help="Frames per shard (resume granularity)")
+    ap.add_argument("--max-hands", type=int, default=2)
+    ap.add_argument("--detection-conf", type=float, default=0.5)
+    args = ap.parse_args(argv)
+
+    videos = find_videos(args.videos)
+    if not videos:
+        print(f"No labeled videos found under {args.videos}.")
+        return
+    os.makedirs(args.out, exist_ok=True)
+    # Partial shards of an interrupted run; their videos resume at the first missing shard
+    for tmp in glob.glob(os.path.join(args.out, "*" + TMP_SUFFIX)):
+        os.remove(tmp)
+    print(f"Extracting {len(videos)} videos with {args.workers} workers -> {args.out}")
+
+    per_worker: Dict[int, List[float]] = {}
+    t0 = time.perf_counter()
+    total_frames = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.max_hands, args.detection_conf)) as pool:
+        futures = [pool.submit(extract_video, p, lbl, args.out, args.shard_frames) for p, lbl in videos]
+        for fut in as_completed(futures):
+            st = fut.result()
+            if "error" in st:
+                print(f"  ! {st['video']}: {st['error']}")
+                continue
+            if st.get("skipped"):
+                print(f"  = {st['video']} (already done)")
+                continue
+            fps = st["frames"] / max(st["seconds"], 1e-9)
+            acc = per_worker.setdefault(st["pid"], [0, 0.0])
+            acc[0] += st["frames"]; acc[1] += st["seconds"]
+            total_frames += st["frames"]
+            print(f"  + {st['video']}: {st['frames']} frames, {st['hands']} hands, {fps:.1f} fps (pid {st['pid']})")
+
+    wall = time.perf_counter() - t0
+    for pid, (frames, secs) in sorted(per_worker.items()):
+        print(f"worker {pid}: {frames} frames in {secs:.1f}s = {frames / max(secs, 1e-9):.1f} fps")
+    print(f"total: {total_frames} frames in {wall:.1f}s = {total_frames / max(wall, 1e-9):.1f} fps")
+
+if __name__ == "__main__":
+    main()
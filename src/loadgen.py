@@ -0,0 +1,132 @@
+"""
+Load generator for src.server: many simulated stations replaying synthetic landmark streams.
+
+    python -m src.server --synthetic-model &
+    python -m src.loadgen --clients 64 --fps 30 --seconds 10 --out load.json
+
+Every client holds a jittered synthetic hand for --hold frames before switching, so the server's
+smoothers see real label transitions. Round-trip latency uses the client timestamp echoed in each
+RESULT; drops are the server's per-session count (--overflow drop).
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+
+from src.bench import synthetic_hands
+from src.utils.protocol import (
+    HAND_DTYPE, MSG_BYE, MSG_ERROR, MSG_HELLO, MSG_RESULT, MSG_STATS,
+    decode_result, encode_landmarks, pack, pack_json, read_message,
+)
+
+def _now_ms() -> float:
+    return time.perf_counter() * 1000.0
+
+async def _connect(connect: str, unix: str):
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    host, _, port = connect.rpartition(":")
+    return await asyncio.open_connection(host or "127.0.0.1", int(port))
+
+async def run_client(i: int, args) -> Dict[str, Any]:
+    reader, writer = await _connect(args.connect, args.unix)
+    writer.write(pack_json(MSG_HELLO, {"session": f"{args.prefix}-{i}", "mode": args.mode, "smooth": args.smooth}))
+
+    poses = synthetic_hands(64, seed=i)
+    rec = np.zeros(args.hands, dtype=HAND_DTYPE)
+    rec["handedness"] = np.arange(args.hands) % 2
+    rec["score"] = 0.95
+    rtt: List[float] = []
+    out: Dict[str, Any] = {"sent": 0, "results": 0, "steps": 0, "error": None, "stats": None}
+
+    async def receive():
+        while True:
+            msg_type, payload = await read_message(reader)
+            if msg_type == MSG_RESULT:
+                r = decode_result(payload)
+                rtt.append(_now_ms() - r["t_ms"])
+                out["results"] += 1
+                out["steps"] += r["info"] is not None
+            elif msg_type == MSG_STATS:
+                out["stats"] = json.loads(payload)
+                return
+            elif msg_type == MSG_ERROR:
+                out["error"] = json.loads(payload).get("error")
+                return
+
+    rx = asyncio.create_task(receive())
+    period = 1.0 / args.fps if args.fps > 0 else 0.0
+    loop = asyncio.get_running_loop()
+    t_end = loop.time() + args.seconds
+    next_t = loop.time()
+    seq = 0
+    try:
+        while loop.time() < t_end and not rx.done():
+            rec["points"] = poses[(seq // args.hold) % len(poses)]
+            writer.write(encode_landmarks(seq, _now_ms(), rec))
+            await writer.drain()
+            seq += 1
+            if period:
+                next_t += period
+                await asyncio.sleep(max(0.0, next_t - loop.time()))
+            else:
+                await asyncio.sleep(0)
+        out["sent"] = seq
+        if not rx.done():
+            writer.write(pack(MSG_BYE))
+            await writer.drain()
+        await asyncio.wait_for(rx, timeout=10.0)
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+        out["error"] = out["error"] or f"{type(e).__name__}: {e}"
+    finally:
+        rx.cancel()
+        writer.close()
+    out["rtt_ms"] = rtt
+    return out
+
+async def run(args) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    clients = await asyncio.gather(*(run_client(i, args) for i in range(args.clients)))
+    wall = time.perf_counter() - t0
+    rtt = np.concatenate([np.asarray(c.pop("rtt_ms"), dtype=np.float64) for c in clients])
+    p50, p95, p99 = np.percentile(rtt, [50, 95, 99]) if len(rtt) else (0.0, 0.0, 0.0)
+    results = sum(c["results"] for c in clients)
+    return {
+        "clients": args.clients, "fps": args.fps, "hands": args.hands, "seconds": round(wall, 2),
+        "sent": sum(c["sent"] for c in clients),
+        "results": results,
+        "mode_steps": sum(c["steps"] for c in clients),
+        "dropped": sum((c["stats"] or {}).get("dropped", 0) for c in clients),
+        "errors": [c["error"] for c in clients if c["error"]],
+        "results_per_s": round(results / wall, 1),
+        "rtt_p50_ms": round(float(p50), 3),
+        "rtt_p95_ms": round(float(p95), 3),
+        "rtt_p99_ms": round(float(p99), 3),
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Replay synthetic landmark streams against src.server.")
+    ap.add_argument("--connect", default="127.0.0.1:8765", help="host:port of the server")
+    ap.add_argument("--unix", default="", help="Unix socket path (overrides --connect)")
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--fps", type=float, default=30.0, help="Frames per second per client (0 = as fast as possible)")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--hands", type=int, default=1, help="Hands per frame")
+    ap.add_argument("--hold", type=int, default=15, help="Frames each synthetic pose is held")
+    ap.add_argument("--mode", choices=("tutorial", "free_play"), default="free_play")
+    ap.add_argument("--smooth", type=int, default=7, help="Server-side smoothing window (0 = off)")
+    ap.add_argument("--prefix", default="load", help="Session id prefix")
+    ap.add_argument("--out", default="", help="Write the report JSON here")
+    args = ap.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
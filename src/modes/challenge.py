@@ -3,6 +3,7 @@ from typing import Dict, List
 from src.core.feedback_engine import AdaptiveCoach
 from src.core.sound_engine import SoundEngine
 from src.utils.mappings import LABEL_TO_NOTES
+from src.utils.metrics import timed
 
 PATTERNS = [
     ["NOTE_C4", "NOTE_D4", "NOTE_E4"],
@@ -23,10 +24,11 @@ class ChallengeMode:
     def target_label(self) -> str:
         return self.pattern[self.pos]
 
+    @timed("mode.challenge")
     def handle_prediction(self, label: str, confidence: float, reaction_ms: int) -> Dict:
         target = self.target_label()
         correct = (label == target and confidence >= 0.6)
-        self.coach.update(correct, reaction_ms)
+        self.coach.update(correct, reaction_ms, label=target)
         if correct:
             self.sound.play_notes(LABEL_TO_NOTES[target], dur=0.25)
             self.pos += 1
@@ -1,11 +1,13 @@
 from typing import Dict
 from src.core.sound_engine import SoundEngine
 from src.utils.mappings import LABEL_TO_NOTES
+from src.utils.metrics import timed
 
 class FreePlayMode:
     def __init__(self, sound: SoundEngine):
         self.sound = sound
 
+    @timed("mode.free_play")
     def handle_prediction(self, label: str, confidence: float) -> Dict:
         notes = LABEL_TO_NOTES.get(label, [])
         if notes and confidence >= 0.5:
@@ -1,8 +1,13 @@
 from typing import Dict
 import time
 from src.core.feedback_engine import AdaptiveCoach
+from src.core.finger_state import NO_FINGER
 from src.core.sound_engine import SoundEngine
 from src.utils.mappings import LABEL_TO_NOTES
+from src.utils.metrics import timed
+
+# Labels that mean "no gesture": they release the last one but are never scored
+RELEASE_LABELS = ("", NO_FINGER)
 
 class TutorialMode:
     """
@@ -11,6 +16,10 @@ class TutorialMode:
       - Advances to the next target
       - Requires the user to RELEASE the last gesture before accepting the next
       - Debounce to avoid re-triggering on consecutive frames
+    events=True is for input that is already a stream of stable-label transitions (LabelSmoother):
+    every event is a new gesture, so the release gate and debounce are skipped and each one is scored.
+    "" / NONE labels are never scored, so the coach is not charged a miss for a released hand.
+    Every result carries "scored" (the coach was updated with this prediction) and "correct".
     """
     def __init__(
         self,
@@ -20,6 +29,7 @@ class TutorialMode:
         confidence_thresh: float = 0.6,
         debounce_ms: int = 500,
         release_frames: int = 5,
+        events: bool = False,
     ):
         # Default lesson if none provided
         self.lesson = lesson or ["NOTE_C4", "NOTE_D4", "NOTE_E4", "C_CHORD"]
@@ -31,6 +41,7 @@ class TutorialMode:
         self.conf_thresh = confidence_thresh
         self.debounce_ms = debounce_ms
         self.release_frames_needed = release_frames
+        self.events = events
 
         # Internal state
         self._cooldown_until_ms = 0.0
@@ -50,18 +61,24 @@ class TutorialMode:
     def _in_cooldown(self) -> bool:
         return (time.time() * 1000) < self._cooldown_until_ms
 
+    def _status(self, target, label: str, confidence: float, scored: bool = False, correct: bool = False) -> Dict:
+        return {
+            "target": target,
+            "pred": label,
+            "conf": round(confidence, 2),
+            "coach": self.coach.summary(),
+            "done": self.is_done(),
+            "scored": scored,
+            "correct": correct,
+        }
+
+    @timed("mode.tutorial")
     def handle_prediction(self, label: str, confidence: float, reaction_ms: int) -> Dict:
         target = self.target_label()
 
         # Finished lesson: return status, no further logic
         if target is None:
-            return {
-                "target": None,
-                "pred": label,
-                "conf": round(confidence, 2),
-                "coach": self.coach.summary(),
-                "done": True,
-            }
+            return self._status(None, label, confidence)
 
         # If waiting for release of the last accepted label, require a few frames without that label
         if self._await_release:
@@ -74,19 +91,17 @@ class TutorialMode:
                     self._lock_label = None
                     self._release_count = 0
             # No coach update during release wait; just report current status
-            return {
-                "target": target,
-                "pred": label,
-                "conf": round(confidence, 2),
-                "coach": self.coach.summary(),
-                "done": False,
-            }
+            return self._status(target, label, confidence)
+
+        # A released hand is not an attempt
+        if label in RELEASE_LABELS:
+            return self._status(target, label, confidence)
 
         # Normal recognition path
         correct = (label == target and confidence >= self.conf_thresh)
-        self.coach.update(correct, reaction_ms)
+        self.coach.update(correct, reaction_ms, label=target)
 
-        if correct and not self._in_cooldown():
+        if correct and (self.events or not self._in_cooldown()):
             # Play once
             notes = LABEL_TO_NOTES.get(target, [])
             if notes:
@@ -95,15 +110,11 @@ class TutorialMode:
             # Advance to next index (can go past end so is_done() is True thereafter)
             self.idx += 1
 
-            # Lock until user releases this gesture
-            self._await_release = True
-            self._lock_label = label
-            self._start_cooldown()
+            if not self.events:
+                # Lock until user releases this gesture
+                self._await_release = True
+                self._lock_label = label
+                self._start_cooldown()
 
-        return {
-            "target": self.target_label(),  # may be None after advancing
-            "pred": label,
-            "conf": round(confidence, 2),
-            "coach": self.coach.summary(),
-            "done": self.is_done(),
-        }
+        # target may be None after advancing
+        return self._status(self.target_label(), label, confidence, scored=True, correct=correct)
@@ -0,0 +1,313 @@
+"""
+Landmark-stream inference server: thin clients send hand landmarks, one process classifies,
+smooths, steps the modes and coaches for many stations.
+
+    python -m src.server --model models/gesture_model.pkl --listen 127.0.0.1:8765
+    python -m src.server --unix /tmp/guided_piano.sock --synthetic-model
+
+Wire format: src/utils/protocol.py. A connection opens with HELLO naming its session; the session
+keeps its TutorialMode/FreePlayMode, AdaptiveCoach and LabelSmoother across reconnects. Notes a
+mode would play are returned to the client in the RESULT instead of being played here.
+
+Backpressure is per session:
+  - landmark frames wait in a bounded queue of --queue frames per session
+  - --overflow drop: a full queue discards its oldest frame; every RESULT carries the drop count
+  - --overflow block: a full queue stops reading that socket, so TCP flow control slows the client
+  - results are written with drain(), so a client that stops reading stalls only its own session
+"""
+from __future__ import annotations
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import numpy as np
+
+from src.core.batching import BatchingPredictor
+from src.core.feedback_engine import AdaptiveCoach
+from src.core.smoothing import LabelSmoother, NO_LABEL
+from src.modes.free_play import FreePlayMode
+from src.modes.tutorial import TutorialMode
+from src.utils.features import extract_features_batch
+from src.utils.metrics import METRICS, PrometheusFileExporter
+from src.utils.protocol import (
+    MSG_BYE, MSG_ERROR, MSG_HELLO, MSG_LANDMARKS, MSG_STATS, ProtocolError,
+    decode_landmarks, encode_result, pack_json, read_message,
+)
+from src.utils.storage import log_session_event
+
+MODES = ("tutorial", "free_play")
+
+class _NoteSink:
+    """Stands in for SoundEngine: collects the notes a mode plays so they can go back to the client."""
+    def __init__(self):
+        self.notes: List[str] = []
+
+    def play_notes(self, notes, dur: float = 0.5, velocity: int = 90):
+        self.notes.extend(notes)
+
+    def take(self) -> List[str]:
+        notes, self.notes = self.notes, []
+        return notes
+
+class Session:
+    """Per-station state; survives reconnects with the same session id."""
+    def __init__(self, sid: str, mode: str, learner: str = "", lesson: Optional[List[str]] = None,
+                 smooth: int = 7):
+        if mode not in MODES:
+            raise ProtocolError(f"unknown mode {mode!r}; expected one of {MODES}")
+        self.id = sid
+        self.mode_name = mode
+        self.learner = learner or sid
+        self.sound = _NoteSink()
+        self.coach = AdaptiveCoach()
+        # With smoothing the mode only sees stable-label transitions: each one is a new gesture
+        self.smoother = LabelSmoother(window=smooth) if smooth > 1 else None
+        if mode == "tutorial":
+            self.mode = TutorialMode(self.coach, self.sound, lesson=lesson or None,
+                                     events=self.smoother is not None)
+        else:
+            self.mode = FreePlayMode(self.sound)
+        self.queue: Optional[asyncio.Queue] = None
+        self.connected = False
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.steps = 0
+        self._last_frame_ms: Optional[float] = None
+        self._last_event_ms: Optional[float] = None
+
+    def stats(self) -> Dict[str, Any]:
+        out = {
+            "session": self.id, "mode": self.mode_name, "received": self.received,
+            "processed": self.processed, "dropped": self.dropped, "steps": self.steps,
+            "coach": self.coach.summary(),
+        }
+        if self.mode_name == "tutorial":
+            out["target"] = self.mode.target_label()
+            out["done"] = self.mode.is_done()
+        return out
+
+class InferenceServer:
+    """
+    Connection handler for asyncio.start_server / start_unix_server.
+    Classification runs inline on the event loop by default: with the compiled forest it takes well
+    under a millisecond per frame. With a BatchingPredictor, frames from concurrent sessions are
+    classified together on its worker thread while the loop keeps serving sockets.
+    """
+    def __init__(self, classifier, queue_size: int = 4, overflow: str = "drop", log_path: str = "",
+                 batcher: Optional[BatchingPredictor] = None):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.clf = classifier
+        self.batcher = batcher
+        self.queue_size = max(1, queue_size)
+        self.overflow = overflow
+        self.log_path = log_path
+        self.sessions: Dict[str, Session] = {}
+
+    def _attach(self, hello: Dict[str, Any]) -> Session:
+        if not isinstance(hello, dict):
+            raise ProtocolError("HELLO payload must be a JSON object")
+        sid = str(hello.get("session") or "")
+        if not sid:
+            raise ProtocolError("HELLO needs a session id")
+        mode = hello.get("mode", "tutorial")
+        s = self.sessions.get(sid)
+        if s is not None and s.connected:
+            raise ProtocolError(f"session {sid!r} is already connected")
+        if s is None or s.mode_name != mode:
+            lesson = hello.get("lesson")
+            if lesson is not None and not (isinstance(lesson, list) and all(isinstance(x, str) for x in lesson)):
+                raise ProtocolError("HELLO lesson must be a list of labels")
+            try:
+                smooth = int(hello.get("smooth", 7))
+            except (TypeError, ValueError):
+                raise ProtocolError("HELLO smooth must be an integer") from None
+            s = self.sessions[sid] = Session(sid, mode, str(hello.get("learner", "")), lesson, smooth)
+        s.queue = asyncio.Queue(maxsize=self.queue_size)
+        s.connected = True
+        return s
+
+    async def classify(self, hands: np.ndarray) -> Tuple[str, float]:
+        """Label of the first hand; with a batcher, concurrent sessions share predict calls."""
+        if not len(hands):
+            return NO_LABEL, 0.0
+        feats = extract_features_batch(hands["points"][:1])[0]
+        if self.batcher is not None:
+            return await self.batcher.predict_label_async(feats)
+        return self.clf.predict_label(feats)
+
+    def step(self, s: Session, t_ms: float, label: str, conf: float) -> Optional[Dict[str, Any]]:
+        """Advance the session's smoother and mode with one classified frame; returns mode info or None."""
+        s.processed += 1
+        if s._last_frame_ms is None:
+            s._last_frame_ms = s._last_event_ms = t_ms
+
+        step = (label, conf, int(t_ms - s._last_frame_ms))
+        s._last_frame_ms = t_ms
+        if s.smoother is not None:
+            ev = s.smoother.update(label, conf)
+            step = None
+            if ev is not None:
+                step = (ev.label, ev.confidence, int(t_ms - s._last_event_ms))
+                s._last_event_ms = t_ms
+        if step is None:
+            return None
+
+        s.steps += 1
+        if s.mode_name == "free_play":
+            info = s.mode.handle_prediction(step[0], step[1])
+        else:
+            tgt_before = s.mode.target_label()
+            info = s.mode.handle_prediction(*step)
+            # Only predictions the mode scored are attempts; gated and release steps are not
+            if self.log_path and info.get("scored"):
+                coach = info.get("coach", {})
+                log_session_event(self.log_path, {
+                    "learner": s.learner, "session": s.id, "mode": s.mode_name, "target": tgt_before,
+                    "pred": step[0], "conf": round(float(step[1]), 3),
+                    "correct": info["correct"], "reaction_ms": step[2],
+                    "level": coach.get("level"), "tempo_bpm": coach.get("tempo_bpm"),
+                })
+        info["notes"] = s.sound.take()
+        return info
+
+    async def _enqueue(self, s: Session, item) -> None:
+        q = s.queue
+        if self.overflow == "block":
+            await q.put(item)
+            return
+        if q.full():
+            q.get_nowait()
+            q.task_done()
+            s.dropped += 1
+            METRICS.count("server_frames_dropped")
+        q.put_nowait(item)
+
+    async def _consume(self, s: Session, writer: asyncio.StreamWriter) -> None:
+        q = s.queue
+        try:
+            while True:
+                seq, t_ms, hands = await q.get()
+                try:
+                    label, conf = await self.classify(hands)
+                    with METRICS.timer("server.step"):
+                        info = self.step(s, t_ms, label, conf)
+                    writer.write(encode_result(seq, t_ms, label, conf, q.qsize(), s.dropped, info))
+                    await writer.drain()
+                finally:
+                    q.task_done()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A failing session must not take the server down; report, hang up and empty the
+            # queue so a reader blocked on a full queue wakes up and sees the consumer is gone
+            if not isinstance(e, ConnectionError):
+                with suppress(Exception):
+                    writer.write(pack_json(MSG_ERROR, {"error": f"{type(e).__name__}: {e}"}))
+            writer.close()
+            while not q.empty():
+                q.get_nowait()
+                q.task_done()
+            raise
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        s: Optional[Session] = None
+        consumer: Optional[asyncio.Task] = None
+        try:
+            msg_type, payload = await read_message(reader)
+            if msg_type != MSG_HELLO:
+                raise ProtocolError("expected HELLO")
+            s = self._attach(json.loads(payload))
+            consumer = asyncio.create_task(self._consume(s, writer))
+            METRICS.count("server_connections")
+            while not consumer.done():
+                msg_type, payload = await read_message(reader)
+                if msg_type == MSG_LANDMARKS:
+                    s.received += 1
+                    METRICS.count("server_frames")
+                    await self._enqueue(s, decode_landmarks(payload))
+                elif msg_type == MSG_BYE:
+                    await s.queue.join()
+                    writer.write(pack_json(MSG_STATS, s.stats()))
+                    await writer.drain()
+                    break
+                else:
+                    raise ProtocolError(f"unexpected message type {msg_type}")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (ProtocolError, ValueError) as e:
+            with suppress(Exception):
+                writer.write(pack_json(MSG_ERROR, {"error": str(e)}))
+                await writer.drain()
+        finally:
+            if consumer is not None:
+                consumer.cancel()
+                with suppress(BaseException):
+                    await consumer
+            if s is not None:
+                s.connected = False
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+async def serve(server: InferenceServer, listen: str = "127.0.0.1:8765", unix: str = "") -> None:
+    if unix:
+        srv = await asyncio.start_unix_server(server.handle, path=unix)
+        where = unix
+    else:
+        host, _, port = listen.rpartition(":")
+        srv = await asyncio.start_server(server.handle, host or "127.0.0.1", int(port))
+        where = listen
+    print(f"Serving landmark streams on {where} (queue={server.queue_size}, overflow={server.overflow})")
+    async with srv:
+        await srv.serve_forever()
+
+def load_classifier(model: str, synthetic: bool):
+    if synthetic:
+        from src.bench import train_small_classifier
+        return train_small_classifier()
+    from src.core.model_registry import get_classifier
+    return get_classifier(model)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Serve gesture recognition and coaching to landmark-streaming clients.")
+    ap.add_argument("--model", default="models/gesture_model.pkl")
+    ap.add_argument("--synthetic-model", action="store_true",
+                    help="Train a small throwaway model on synthetic hands (load testing only)")
+    ap.add_argument("--listen", default="127.0.0.1:8765", help="host:port for TCP")
+    ap.add_argument("--unix", default="", help="Unix socket path (overrides --listen)")
+    ap.add_argument("--queue", type=int, default=4, help="Landmark frames buffered per session")
+    ap.add_argument("--overflow", choices=("drop", "block"), default="drop")
+    ap.add_argument("--batch", type=int, default=0, help="Micro-batch up to N frames across sessions (0 = off)")
+    ap.add_argument("--batch-wait-us", type=int, default=500, help="Longest a frame waits for its batch to fill")
+    ap.add_argument("--log", default="", help="Append tutorial attempts to this session log")
+    ap.add_argument("--metrics", default="", help="Write Prometheus metrics to this file")
+    args = ap.parse_args(argv)
+
+    if not args.synthetic_model and not os.path.exists(args.model):
+        ap.error(f"model not found: {args.model} (train one, or pass --synthetic-model)")
+    clf = load_classifier(args.model, args.synthetic_model)
+    batcher = BatchingPredictor(clf, args.batch, args.batch_wait_us) if args.batch > 0 else None
+    server = InferenceServer(clf, args.queue, args.overflow, args.log, batcher)
+    exporter = None
+    if args.metrics:
+        METRICS.enabled = True
+        exporter = PrometheusFileExporter(args.metrics).start()
+    if args.unix and os.path.exists(args.unix):
+        os.unlink(args.unix)
+    try:
+        asyncio.run(serve(server, args.listen, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if batcher is not None:
+            print(json.dumps(batcher.stats()))
+            batcher.close()
+        if exporter is not None:
+            exporter.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Train the gesture classifier from recorded landmarks, picking the most accurate model that
+fits a per-frame latency budget.
+
+    python -m src.train --store data/gestures/store --shards data/gestures --budget-ms 1.0
+
+Every (forest size, depth, feature set) candidate is cross-validated in parallel across all
+cores. Each candidate is then refit on all data, compiled, and timed on single-sample
+predict_label calls. The winner is saved to --out together with a JSON report.
+"""
+from __future__ import annotations
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+import os
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+from src.core.gesture_classifier import GestureClassifier
+from src.utils.features import FEATURE_GROUPS, extract_features_batch
+
+FEATURE_SETS = {
+    "all": None,
+    "distances": FEATURE_GROUPS["tip_dists"] + FEATURE_GROUPS["pair_dists"],
+    "tips_angles": FEATURE_GROUPS["tip_dists"] + FEATURE_GROUPS["angles"],
+}
+
+def load_landmarks(store_dir: str = "", shard_dir: str = "", max_per_label: int = 0,
+                   seed: int = 0) -> Tuple[np.ndarray, List[str]]:
+    """Collect (M, 21, 2) landmarks and labels from a LandmarkStore and/or extract_dataset shards."""
+    points: List[np.ndarray] = []
+    labels: List[str] = []
+    if store_dir and os.path.isdir(store_dir):
+        from src.utils.recording import LandmarkStore
+        store = LandmarkStore(store_dir)
+        names = store.id_to_label
+        for part in store.iter_batches():
+            points.append(np.asarray(part["points"][:, :, :2]))
+            labels.extend(names[int(i)] for i in part["label"])
+    if shard_dir and os.path.isdir(shard_dir):
+        from src.extract_dataset import iter_shards
+        for shard in iter_shards(shard_dir):
+            points.append(shard["points"][:, :, :2])
+            labels.extend([str(shard["label"])] * len(shard["points"]))
+    if not points:
+        return np.zeros((0, 21, 2), dtype=np.float32), []
+    P = np.concatenate(points).astype(np.float32, copy=False)
+
+    if max_per_label:
+        rng = np.random.default_rng(seed)
+        y = np.asarray(labels)
+        keep = np.concatenate([
+            rng.permutation(np.flatnonzero(y == lbl))[:max_per_label] for lbl in np.unique(y)
+        ])
+        keep.sort()
+        P, labels = P[keep], [labels[i] for i in keep]
+    return P, labels
+
+def _cv_candidate(X: np.ndarray, y: np.ndarray, params: Dict, folds: int, seed: int) -> Dict:
+    clf = GestureClassifier(n_estimators=params["n_estimators"], max_depth=params["max_depth"],
+                            feature_idx=FEATURE_SETS[params["features"]], n_jobs=1)
+    Xs = clf._select(X)
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    scores = cross_val_score(clone(clf.model), Xs, y, cv=cv, n_jobs=1)
+    return {**params, "cv_mean": float(scores.mean()), "cv_std": float(scores.std())}
+
+def _fit_candidate(X: np.ndarray, labels: List[str], params: Dict) -> GestureClassifier:
+    clf = GestureClassifier(n_estimators=params["n_estimators"], max_depth=params["max_depth"],
+                            feature_idx=FEATURE_SETS[params["features"]], n_jobs=1)
+    clf.fit(X, labels)
+    return clf
+
+def measure_latency(clf: GestureClassifier, X: np.ndarray, iters: int = 300) -> Dict[str, float]:
+    """Single-sample predict_label latency (the per-frame call) in ms."""
+    n = len(X)
+    for i in range(min(20, n)):
+        clf.predict_label(X[i])
+    samples = np.empty(iters)
+    for i in range(iters):
+        x = X[i % n]
+        t0 = time.perf_counter_ns()
+        clf.predict_label(x)
+        samples[i] = (time.perf_counter_ns() - t0) / 1e6
+    p50, p95 = np.percentile(samples, [50, 95])
+    return {"p50_ms": round(float(p50), 4), "p95_ms": round(float(p95), 4)}
+
+def select(candidates: List[Dict], budget_ms: float) -> Tuple[Dict, bool]:
+    """Most accurate candidate whose p95 latency fits the budget (ties -> faster); else the fastest."""
+    within = [c for c in candidates if c["p95_ms"] <= budget_ms]
+    if within:
+        return max(within, key=lambda c: (round(c["cv_mean"], 4), -c["p95_ms"])), True
+    return min(candidates, key=lambda c: c["p95_ms"]), False
+
+def _parse_ints(s: str) -> List[Optional[int]]:
+    return [None if v.strip().lower() == "none" else int(v) for v in s.split(",") if v.strip()]
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Train the gesture classifier with a latency-aware model search.")
+    ap.add_argument("--store", default="data/gestures/store", help="LandmarkStore folder")
+    ap.add_argument("--shards", default="data/gestures", help="Folder of extract_dataset .npz shards")
+    ap.add_argument("--out", default="models/gesture_model.pkl")
+    ap.add_argument("--budget-ms", type=float, default=1.0, help="Max p95 predict_label latency per frame")
+    ap.add_argument("--trees", default="25,50,100,200")
+    ap.add_argument("--depths", default="8,12,16,none")
+    ap.add_argument("--feature-sets", default=",".join(FEATURE_SETS))
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--max-per-label", type=int, default=0, help="Subsample each label to at most N rows")
+    ap.add_argument("--jobs", type=int, default=-1)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    P, labels = load_landmarks(args.store, args.shards, args.max_per_label, args.seed)
+    if len(labels) < args.folds:
+        print("Not enough recorded landmarks to train (see data/gestures/README.md).")
+        return
+    t0 = time.perf_counter()
+    X = extract_features_batch(P)
+    label_names = sorted(set(labels))
+    y = np.array([label_names.index(l) for l in labels], dtype=np.int32)
+    print(f"{len(X)} samples, {len(label_names)} labels, features in {time.perf_counter() - t0:.2f}s")
+
+    grid = [
+        {"n_estimators": t, "max_depth": d, "features": f}
+        for t, d, f in product(_parse_ints(args.trees), _parse_ints(args.depths), args.feature_sets.split(","))
+    ]
+    t0 = time.perf_counter()
+    results = Parallel(n_jobs=args.jobs)(delayed(_cv_candidate)(X, y, p, args.folds, args.seed) for p in grid)
+    print(f"cross-validated {len(grid)} candidates in {time.perf_counter() - t0:.1f}s")
+
+    models = Parallel(n_jobs=args.jobs)(delayed(_fit_candidate)(X, labels, p) for p in grid)
+    # Latency is timed sequentially so candidates don't compete for cores
+    for res, clf in zip(results, models):
+        res.update(measure_latency(clf, X))
+        print(f"  trees={res['n_estimators']:<4} depth={str(res['max_depth']):<5} feats={res['features']:<12}"
+              f" acc={res['cv_mean']:.3f}±{res['cv_std']:.3f}  p50={res['p50_ms']:.3f}ms p95={res['p95_ms']:.3f}ms")
+
+    best, fits = select(results, args.budget_ms)
+    if not fits:
+        print(f"Warning: no candidate meets {args.budget_ms} ms; using the fastest one.")
+    winner = models[results.index(best)]
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    winner.save(args.out)
+    if args.out.endswith(".pkl"):
+        # Compact non-pickle copy; the app prefers it (memory-mapped, no sklearn unpickling)
+        winner.save(os.path.splitext(args.out)[0] + ".npz")
+
+    report = {
+        "selected": best, "within_budget": fits, "budget_ms": args.budget_ms,
+        "n_samples": int(len(X)), "labels": label_names, "candidates": results,
+    }
+    report_path = os.path.splitext(args.out)[0] + ".report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {args.out} (acc={best['cv_mean']:.3f}, p95={best['p95_ms']:.3f} ms); report: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,56 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import numpy as np
 
+from src.utils.metrics import timed
+
 # MediaPipe index pairs to compute distances/angles
 FINGERTIP_IDX = [4, 8, 12, 16, 20]
 WRIST_IDX = 0
+SCALE_IDX = 9  # index MCP as a palm-size proxy
+
+# Precomputed index tables (fingertip pairs in np.triu_indices(5, k=1) order)
+_TIPS = np.asarray(FINGERTIP_IDX, dtype=np.intp)
+_TRI_I, _TRI_J = np.triu_indices(len(FINGERTIP_IDX), k=1)
+_N_TIPS = len(FINGERTIP_IDX)
+_N_PAIRS = len(_TRI_I)
+
+# Layout: [fingertip-wrist dists | fingertip pair dists | fingertip angles]
+FEATURE_DIM = _N_TIPS + _N_PAIRS + _N_TIPS
+FEATURE_GROUPS = {
+    "tip_dists": list(range(0, _N_TIPS)),
+    "pair_dists": list(range(_N_TIPS, _N_TIPS + _N_PAIRS)),
+    "angles": list(range(_N_TIPS + _N_PAIRS, FEATURE_DIM)),
+}
+
+def _vec_norm(v: np.ndarray) -> np.ndarray:
+    # Norm over the last axis via the same dot-product kernel np.linalg.norm uses for a 1-D vector,
+    # so batched results match the per-vector computation bit for bit.
+    return np.sqrt((v[..., None, :] @ v[..., :, None])[..., 0, 0])
+
+@timed("features.extract_batch")
+def extract_features_batch(landmarks: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Turn (N, 21, 2|3) landmarks into an (N, FEATURE_DIM) float32 matrix; writes into `out` if given."""
+    lm = np.asarray(landmarks)
+    if not np.issubdtype(lm.dtype, np.floating):
+        lm = lm.astype(np.float32)
+    n = lm.shape[0]
+    if out is None:
+        out = np.empty((n, FEATURE_DIM), dtype=np.float32)
+    elif out.shape != (n, FEATURE_DIM):
+        raise ValueError(f"out must have shape {(n, FEATURE_DIM)}, got {out.shape}")
+
+    # Wrist-centered, scaled by palm size; only the wrist, scale point and fingertips are needed
+    wrist = lm[:, WRIST_IDX]
+    scale = _vec_norm(lm[:, SCALE_IDX] - wrist) + 1e-6
+    tips = lm[:, _TIPS] - wrist[:, None, :]
+    tips /= scale[:, None, None]
 
-def _pairwise_dists(points: np.ndarray) -> np.ndarray:
-    # points: (21, 2) normalized [0,1]
-    diffs = points[:, None, :] - points[None, :, :]
-    dists = np.linalg.norm(diffs, axis=-1)  # (21, 21)
-    return dists
+    out[:, :_N_TIPS] = _vec_norm(tips)
+    out[:, _N_TIPS:_N_TIPS + _N_PAIRS] = np.linalg.norm(tips[:, _TRI_I] - tips[:, _TRI_J], axis=-1)
+    out[:, _N_TIPS + _N_PAIRS:] = np.arctan2(tips[..., 1], tips[..., 0])
+    return out
 
+@timed("features.extract")
 def extract_features(landmarks: np.ndarray) -> Dict[str, Any]:
     """Turn 21x2 landmarks into a compact, translation/scale-insensitive feature vector."""
-    # Normalize by wrist-centered coordinates and scale by palm size
-    wrist = landmarks[WRIST_IDX]
-    rel = landmarks - wrist
-    scale = np.linalg.norm(rel[9]) + 1e-6  # use index MCP as a scale proxy
-    rel /= scale
-
-    # Distances between fingertips and wrist
-    fingertip_d = [np.linalg.norm(rel[idx]) for idx in FINGERTIP_IDX]
-
-    # Pairwise distances of fingertips (upper-triangular)
-    d = _pairwise_dists(rel[FINGERTIP_IDX])
-    tri = d[np.triu_indices(len(FINGERTIP_IDX), k=1)].tolist()
-
-    # Simple angles for two fingers vs wrist line (approx)
-    angles = []
-    for idx in FINGERTIP_IDX:
-        v = rel[idx]
-        ang = float(np.arctan2(v[1], v[0]))
-        angles.append(ang)
-
-    vec = fingertip_d + tri + angles
-    return {"vector": np.asarray(vec, dtype=np.float32)}
\ No newline at end of file
+    return {"vector": extract_features_batch(np.asarray(landmarks)[None])[0]}
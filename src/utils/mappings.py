@@ -12,4 +12,40 @@ LABEL_TO_NOTES = {
     "CHORD_FSHARP_MINOR": ["F#4", "A4", "C#5"],
     "CHORD_G_MAJOR": ["G4", "B4", "D5"],
     "CHORD_A_MAJOR": ["A4", "C#5", "E5"],
-}
\ No newline at end of file
+}
+
+# Finger index (thumb..pinky) -> chord label for the no-training backends
+FINGER_TO_LABEL = {
+    0: "CHORD_D_MAJOR",     # Thumb
+    1: "CHORD_E_MINOR",     # Index
+    2: "CHORD_FSHARP_MINOR",# Middle
+    3: "CHORD_G_MAJOR",     # Ring
+    4: "CHORD_A_MAJOR",     # Pinky
+}
+
+# Labels a classifier or the finger rules emit for a single hand
+HAND_LABELS = tuple(LABEL_TO_NOTES)
+
+# Two-handed play: the left hand's label picks a bass note (its root, an octave down) and the
+# right hand's label the chord above it
+LABEL_TO_BASS = {
+    "C_CHORD": "C3",
+    "G_CHORD": "G2",
+    "NOTE_C4": "C3",
+    "NOTE_D4": "D3",
+    "NOTE_E4": "E3",
+    "CHORD_D_MAJOR": "D3",
+    "CHORD_E_MINOR": "E3",
+    "CHORD_FSHARP_MINOR": "F#3",
+    "CHORD_G_MAJOR": "G3",
+    "CHORD_A_MAJOR": "A3",
+}
+
+def composite_label(left: str, right: str) -> str:
+    """Slash-chord style label for a left + right hand pair, e.g. "CHORD_G_MAJOR/D3"."""
+    return f"{right}/{LABEL_TO_BASS[left]}"
+
+LABEL_TO_NOTES.update({
+    composite_label(left, right): [LABEL_TO_BASS[left]] + LABEL_TO_NOTES[right]
+    for left in LABEL_TO_BASS for right in HAND_LABELS
+})
@@ -0,0 +1,189 @@
+from __future__ import annotations
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Optional, Sequence
+import os
+import threading
+import time
+import numpy as np
+
+# Latency bucket upper bounds in ms (Prometheus "le"); the last bucket is +Inf
+DEFAULT_BUCKETS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000)
+
+class Histogram:
+    """Fixed-bucket latency histogram; counts live in one preallocated int64 array."""
+    def __init__(self, bounds_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.bounds = [float(b) for b in bounds_ms]
+        self.counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float) -> None:
+        i = bisect_left(self.bounds, ms)
+        with self._lock:
+            self.counts[i] += 1
+            self.total_ms += ms
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing quantile q (inf if it falls in the overflow bucket)."""
+        n = self.count
+        if n == 0:
+            return 0.0
+        i = int(np.searchsorted(np.cumsum(self.counts), q * n))
+        return self.bounds[i] if i < len(self.bounds) else float("inf")
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts[:] = 0
+            self.total_ms = 0.0
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        self.hist.observe((time.perf_counter() - self.t0) * 1000.0)
+        return False
+
+class MetricsRegistry:
+    """
+    Process-wide stage timers and counters.
+      - disabled by default: timer() hands back a shared no-op and count() returns at once
+      - histograms are created on first use per stage name, then reused
+    """
+    def __init__(self, prefix: str = "guided_piano"):
+        self.prefix = prefix
+        self.enabled = False
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        h = self.histograms.get(stage)
+        if h is None:
+            with self._lock:
+                h = self.histograms.setdefault(stage, Histogram())
+        return h
+
+    def timer(self, stage: str):
+        """Context manager timing the enclosed block into `stage`'s histogram."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(stage))
+
+    def observe(self, stage: str, ms: float) -> None:
+        if self.enabled:
+            self.histogram(stage).observe(ms)
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        stages = {}
+        for name, h in list(self.histograms.items()):
+            n = h.count
+            stages[name] = {
+                "count": n,
+                "mean_ms": round(h.total_ms / n, 3) if n else 0.0,
+                "p50_ms": h.quantile(0.50),
+                "p95_ms": h.quantile(0.95),
+                "p99_ms": h.quantile(0.99),
+            }
+        return {"stages": stages, "counters": dict(self.counters)}
+
+    def to_prometheus(self) -> str:
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_stage_latency_ms Per-stage latency in milliseconds.",
+            f"# TYPE {p}_stage_latency_ms histogram",
+        ]
+        for name, h in sorted(self.histograms.items()):
+            cum = np.cumsum(h.counts)
+            for le, c in zip(h.bounds, cum[:-1]):
+                lines.append(f'{p}_stage_latency_ms_bucket{{stage="{name}",le="{le:g}"}} {int(c)}')
+            lines.append(f'{p}_stage_latency_ms_bucket{{stage="{name}",le="+Inf"}} {int(cum[-1])}')
+            lines.append(f'{p}_stage_latency_ms_sum{{stage="{name}"}} {h.total_ms:.6f}')
+            lines.append(f'{p}_stage_latency_ms_count{{stage="{name}"}} {int(cum[-1])}')
+        for name, v in sorted(self.counters.items()):
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {v}")
+        return "\n".join(lines) + "\n"
+
+METRICS = MetricsRegistry()
+
+def timed(stage: str) -> Callable:
+    """Decorator: time every call into `stage` while METRICS is enabled."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                METRICS.histogram(stage).observe((time.perf_counter() - t0) * 1000.0)
+        return wrapper
+    return deco
+
+class PrometheusFileExporter:
+    """Background thread writing METRICS in Prometheus text format to `path` every `interval` s."""
+    def __init__(self, path: str, interval: float = 5.0, registry: Optional[MetricsRegistry] = None):
+        self.path = path
+        self.interval = interval
+        self.registry = registry or METRICS
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.registry.to_prometheus())
+        os.replace(tmp, self.path)  # scrapers never see a half-written file
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError:
+                pass
+
+    def start(self) -> "PrometheusFileExporter":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        try:
+            self.write()
+        except OSError:
+            pass
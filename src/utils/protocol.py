@@ -0,0 +1,99 @@
+"""
+Binary framing for streaming hand landmarks to src.server.
+
+Every message is an 8-byte header followed by `length` payload bytes:
+
+    <u8 version> <u8 type> <u16 reserved> <u32 length>
+
+    HELLO      client -> server  JSON {"session", "mode", "learner", "lesson", "smooth"}
+    LANDMARKS  client -> server  <u32 seq> <f8 t_ms> <u8 n_hands> + n_hands * HAND_DTYPE records
+    RESULT     server -> client  <u32 seq> <f8 t_ms> <f4 conf> <u32 queued> <u32 dropped> <u16 label_len>
+                                 + label (utf-8) + JSON of the mode step (empty when the mode did not step)
+    BYE        client -> server  empty; the server answers with STATS and closes
+    STATS      server -> client  JSON session statistics
+    ERROR      server -> client  JSON {"error": ...}
+
+t_ms is the client's timestamp, echoed back unchanged, so round trips are measured on one clock.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import json
+import struct
+import numpy as np
+
+VERSION = 1
+MSG_HELLO, MSG_LANDMARKS, MSG_RESULT, MSG_BYE, MSG_STATS, MSG_ERROR = 1, 2, 3, 4, 5, 6
+
+_HEADER = struct.Struct("<BBHI")
+_LANDMARKS = struct.Struct("<IdB")
+_RESULT = struct.Struct("<IdfIIH")
+MAX_PAYLOAD = 1 << 20
+
+# One hand on the wire: 173 bytes, decoded with np.frombuffer (no per-point parsing)
+HAND_DTYPE = np.dtype([
+    ("handedness", "i1"),   # 0 = Left, 1 = Right, -1 = unknown (as in recording.py)
+    ("score", "<f4"),
+    ("points", "<f4", (21, 2)),
+])
+HANDEDNESS_TO_ID = {"Left": 0, "Right": 1}
+ID_TO_HANDEDNESS = {0: "Left", 1: "Right", -1: ""}
+
+class ProtocolError(ValueError):
+    pass
+
+def pack(msg_type: int, payload: bytes = b"") -> bytes:
+    return _HEADER.pack(VERSION, msg_type, 0, len(payload)) + payload
+
+def pack_json(msg_type: int, obj: Dict[str, Any]) -> bytes:
+    return pack(msg_type, json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Read one framed message; raises asyncio.IncompleteReadError at EOF."""
+    version, msg_type, _, length = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if version != VERSION:
+        raise ProtocolError(f"unsupported protocol version {version}")
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"payload of {length} bytes exceeds {MAX_PAYLOAD}")
+    return msg_type, (await reader.readexactly(length) if length else b"")
+
+def hands_to_records(hands) -> np.ndarray:
+    """HandLandmarks list -> HAND_DTYPE array."""
+    rec = np.zeros(len(hands), dtype=HAND_DTYPE)
+    for r, h in zip(rec, hands):
+        r["handedness"] = HANDEDNESS_TO_ID.get(h.handedness, -1)
+        r["score"] = h.score
+        r["points"] = np.asarray(h.points, dtype=np.float32)[:, :2]
+    return rec
+
+def encode_landmarks(seq: int, t_ms: float, records: np.ndarray) -> bytes:
+    """`records` is a HAND_DTYPE array (see hands_to_records); at most 255 hands."""
+    records = np.ascontiguousarray(records, dtype=HAND_DTYPE)
+    return pack(MSG_LANDMARKS, _LANDMARKS.pack(seq, t_ms, len(records)) + records.tobytes())
+
+def decode_landmarks(payload: bytes) -> Tuple[int, float, np.ndarray]:
+    """-> (seq, t_ms, HAND_DTYPE view into payload)."""
+    if len(payload) < _LANDMARKS.size:
+        raise ProtocolError("landmark payload shorter than its header")
+    seq, t_ms, n = _LANDMARKS.unpack_from(payload)
+    if len(payload) != _LANDMARKS.size + n * HAND_DTYPE.itemsize:
+        raise ProtocolError("landmark payload size does not match its hand count")
+    return seq, t_ms, np.frombuffer(payload, dtype=HAND_DTYPE, count=n, offset=_LANDMARKS.size)
+
+def encode_result(seq: int, t_ms: float, label: str, conf: float, queued: int, dropped: int,
+                  info: Optional[Dict[str, Any]] = None) -> bytes:
+    lbl = label.encode("utf-8")
+    body = json.dumps(info, separators=(",", ":")).encode("utf-8") if info is not None else b""
+    return pack(MSG_RESULT, _RESULT.pack(seq, t_ms, conf, queued, dropped, len(lbl)) + lbl + body)
+
+def decode_result(payload: bytes) -> Dict[str, Any]:
+    if len(payload) < _RESULT.size:
+        raise ProtocolError("result payload shorter than its header")
+    seq, t_ms, conf, queued, dropped, n = _RESULT.unpack_from(payload)
+    off = _RESULT.size + n
+    body = payload[off:]
+    return {
+        "seq": seq, "t_ms": t_ms, "label": payload[_RESULT.size:off].decode("utf-8"),
+        "conf": conf, "queued": queued, "dropped": dropped,
+        "info": json.loads(body) if body else None,
+    }
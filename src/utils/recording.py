@@ -0,0 +1,250 @@
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import glob
+import json
+import os
+import struct
+import time
+import numpy as np
+
+# One fixed-size record per detected hand
+RECORD_DTYPE = np.dtype([
+    ("t_ms", "<f8"),
+    ("session", "<u4"),
+    ("label", "<i4"),
+    ("handedness", "i1"),   # 0 = Left, 1 = Right, -1 = unknown
+    ("_pad", "u1", (3,)),
+    ("score", "<f4"),
+    ("points", "<f4", (21, 3)),
+])
+
+# Chunk header: magic, version, flags, record size, record count, min/max timestamp
+_MAGIC = b"GPLM"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIQdd")
+HEADER_SIZE = 64
+FLAG_UNSORTED = 1  # some record has t_ms below its predecessor; time slicing must mask
+HANDEDNESS_TO_ID = {"Left": 0, "Right": 1}
+
+def _chunk_path(root: str, k: int) -> str:
+    return os.path.join(root, f"chunk_{k:06d}.lmk")
+
+def read_header(path: str) -> Tuple[int, float, float, int]:
+    """Return (n_records, t_min, t_max, flags) of a chunk file."""
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        raise ValueError(f"{path} is too short for a landmark chunk header")
+    magic, version, flags, rec_size, n, t_min, t_max = _HEADER.unpack(raw)
+    if magic != _MAGIC or version != _VERSION or rec_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a v{_VERSION} landmark chunk")
+    return n, t_min, t_max, flags
+
+class _NameTable:
+    """String <-> int id table persisted as JSON next to the chunks (labels, sessions)."""
+    def __init__(self, path: str):
+        self.path = path
+        self.ids: Dict[str, int] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.ids = json.load(f)
+
+    def id(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.ids)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.ids, f)
+            os.replace(tmp, self.path)
+        return i
+
+    def names(self) -> Dict[int, str]:
+        return {v: k for k, v in self.ids.items()}
+
+class LandmarkRecorder:
+    """
+    Append-only writer for landmark datasets.
+      - records are buffered in a preallocated structured array and appended in bulk on flush()
+      - each chunk file holds at most `chunk_records` records behind a 64-byte header
+      - a chunk starts with a valid empty header; the count is rewritten after the data, so readers
+        never see a partial record
+      - a trailing chunk whose header is unreadable (killed mid-create by an older version) is
+        treated as empty and overwritten
+    Feed it HandTracker.process() output frame by frame with append().
+    """
+    def __init__(self, root: str, chunk_records: int = 1 << 20, buffer_records: int = 4096):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.chunk_records = chunk_records
+        self.labels = _NameTable(os.path.join(root, "labels.json"))
+        self.sessions = _NameTable(os.path.join(root, "sessions.json"))
+        self._buf = np.zeros(buffer_records, dtype=RECORD_DTYPE)
+        self._n = 0
+
+        existing = sorted(glob.glob(os.path.join(root, "chunk_*.lmk")))
+        self._chunk = len(existing) - 1 if existing else 0
+        self._new_chunk()
+        if existing:
+            try:
+                self._count, self._t_min, self._t_max, self._flags = read_header(existing[-1])
+            except ValueError:
+                self._new_chunk()
+            self._t_last = self._t_max
+            if self._count >= chunk_records:
+                self._chunk += 1
+                self._new_chunk()
+
+    def _new_chunk(self) -> None:
+        self._count, self._t_min, self._t_max, self._flags = (0, np.inf, -np.inf, 0)
+        self._t_last = -np.inf
+
+    def append(self, hands, label: str = "", session: str = "default", t_ms: Optional[float] = None) -> None:
+        """Append every HandLandmarks in `hands` (one frame) with a shared label/session/timestamp."""
+        if not hands:
+            return
+        t = time.time() * 1000.0 if t_ms is None else t_ms
+        lid, sid = self.labels.id(label), self.sessions.id(session)
+        for h in hands:
+            if self._n == len(self._buf):
+                self.flush()
+            r = self._buf[self._n]
+            r["t_ms"] = t
+            r["session"] = sid
+            r["label"] = lid
+            r["handedness"] = HANDEDNESS_TO_ID.get(h.handedness, -1)
+            r["score"] = h.score
+            pts = np.asarray(h.points, dtype=np.float32)
+            r["points"][:, :pts.shape[1]] = pts
+            r["points"][:, pts.shape[1]:] = 0.0
+            self._n += 1
+
+    def append_arrays(self, points: np.ndarray, t_ms: np.ndarray, label: str, session: str = "default",
+                      handedness: Optional[np.ndarray] = None, score: Optional[np.ndarray] = None) -> None:
+        """Bulk append (e.g. from extract_dataset shards): points (M, 21, 2|3), t_ms (M,)."""
+        self.flush()
+        m = len(points)
+        if m == 0:
+            return
+        rec = np.zeros(m, dtype=RECORD_DTYPE)
+        rec["t_ms"] = t_ms
+        rec["session"] = self.sessions.id(session)
+        rec["label"] = self.labels.id(label)
+        rec["handedness"] = -1 if handedness is None else handedness
+        rec["score"] = 1.0 if score is None else score
+        rec["points"][:, :, :points.shape[2]] = points
+        self._write(rec)
+
+    def flush(self) -> None:
+        if self._n:
+            self._write(self._buf[:self._n])
+            self._n = 0
+
+    def _write(self, rec: np.ndarray) -> None:
+        while len(rec):
+            room = self.chunk_records - self._count
+            part, rec = rec[:room], rec[room:]
+            path = _chunk_path(self.root, self._chunk)
+            if not os.path.exists(path) or self._count == 0:
+                with open(path, "wb") as f:
+                    f.write(_HEADER.pack(_MAGIC, _VERSION, 0, RECORD_DTYPE.itemsize, 0, np.inf, -np.inf)
+                            .ljust(HEADER_SIZE, b"\0"))
+            with open(path, "r+b") as f:
+                f.seek(HEADER_SIZE + self._count * RECORD_DTYPE.itemsize)
+                f.write(part.tobytes())
+                f.flush()
+                t = part["t_ms"]
+                if t[0] < self._t_last or (len(t) > 1 and np.any(t[1:] < t[:-1])):
+                    self._flags |= FLAG_UNSORTED
+                self._t_last = float(t[-1])
+                self._count += len(part)
+                self._t_min = min(self._t_min, float(t.min()))
+                self._t_max = max(self._t_max, float(t.max()))
+                f.seek(0)
+                f.write(_HEADER.pack(_MAGIC, _VERSION, self._flags, RECORD_DTYPE.itemsize,
+                                     self._count, self._t_min, self._t_max))
+            if self._count >= self.chunk_records:
+                self._chunk += 1
+                self._new_chunk()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class LandmarkStore:
+    """
+    Zero-copy reader over a LandmarkRecorder folder: every chunk is an np.memmap of RECORD_DTYPE.
+    Time-range selection skips chunks by header and uses searchsorted on chunks appended in time
+    order, so it returns views; label/session filters (and unsorted chunks) yield masked copies.
+    A trailing chunk with an unreadable header (a recorder killed while creating it) is skipped.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.labels = _NameTable(os.path.join(root, "labels.json")).ids
+        self.sessions = _NameTable(os.path.join(root, "sessions.json")).ids
+        self.chunks: List[np.ndarray] = []
+        self.t_ranges: List[Tuple[float, float]] = []
+        self.sorted: List[bool] = []
+        paths = sorted(glob.glob(os.path.join(root, "chunk_*.lmk")))
+        for path in paths:
+            try:
+                n, t_min, t_max, flags = read_header(path)
+            except ValueError:
+                if path != paths[-1]:
+                    raise
+                print(f"Warning: skipping unreadable trailing chunk {path}")
+                continue
+            if n == 0:
+                continue
+            self.chunks.append(np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(n,)))
+            self.t_ranges.append((t_min, t_max))
+            self.sorted.append(not flags & FLAG_UNSORTED)
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self.chunks)
+
+    @property
+    def id_to_label(self) -> Dict[int, str]:
+        return {v: k for k, v in self.labels.items()}
+
+    def time_range(self, t0: float = -np.inf, t1: float = np.inf) -> Iterator[np.ndarray]:
+        """Yield records with t0 <= t_ms < t1, chunk by chunk (memmap views for time-ordered chunks)."""
+        for c, (lo, hi), is_sorted in zip(self.chunks, self.t_ranges, self.sorted):
+            if hi < t0 or lo >= t1:
+                continue
+            if t0 <= lo and hi < t1:
+                yield c
+                continue
+            t = c["t_ms"]
+            if not is_sorted:
+                mask = (t >= t0) & (t < t1)
+                if mask.any():
+                    yield c[mask]
+                continue
+            a, b = np.searchsorted(t, t0, "left"), np.searchsorted(t, t1, "left")
+            if b > a:
+                yield c[a:b]
+
+    def iter_batches(self, labels: Optional[Sequence[str]] = None, sessions: Optional[Sequence[str]] = None,
+                     t0: float = -np.inf, t1: float = np.inf, batch: int = 65536) -> Iterator[np.ndarray]:
+        """Yield record arrays of at most `batch` rows matching the filters; memory stays O(batch)."""
+        lid = None if labels is None else np.array([self.labels[l] for l in labels if l in self.labels])
+        sid = None if sessions is None else np.array([self.sessions[s] for s in sessions if s in self.sessions])
+        for view in self.time_range(t0, t1):
+            for a in range(0, len(view), batch):
+                part = view[a:a + batch]
+                if lid is None and sid is None:
+                    yield part
+                    continue
+                mask = np.ones(len(part), dtype=bool)
+                if lid is not None:
+                    mask &= np.isin(part["label"], lid)
+                if sid is not None:
+                    mask &= np.isin(part["session"], sid)
+                if mask.any():
+                    yield part[mask]
@@ -1,9 +1,173 @@
 from __future__ import annotations
-from typing import Dict, Any
-import json, time, os
+from collections import deque
+from typing import Dict, Any, Deque, Optional
+import atexit, gzip, json, os, shutil, struct, threading, time, zipfile
+import numpy as np
+from numpy.lib import format as npy_format
+
+class SessionLogger:
+    """
+    Buffered JSON-lines event log written from a background thread.
+      - log() only appends to an in-memory queue; the writer flushes every `flush_interval`
+        seconds or as soon as `max_batch` events are pending, in one write per batch
+      - the file is rotated when it reaches `max_bytes` or is older than `rotate_interval` s;
+        rotated segments are renamed `<path>.<YYYYmmdd-HHMMSS>[.N]` and gzipped if `compress`
+      - close() (also run at interpreter exit) drains everything still queued
+      - a failed write keeps its batch queued for the next flush; an event json can't serialize is
+        dropped alone. At most `max_pending` events wait in memory (oldest dropped first);
+        `dropped` counts every lost event and each kind of failure is warned about once
+    """
+    def __init__(self, path: str, flush_interval: float = 1.0, max_batch: int = 256,
+                 max_bytes: int = 10 * 1024 * 1024, rotate_interval: Optional[float] = None,
+                 compress: bool = True, max_pending: int = 100_000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self._pending: Deque[Dict[str, Any]] = deque(maxlen=max(1, max_pending))
+        self.dropped = 0
+        self._warned = set()
+        self._wake = threading.Event()
+        self._closed = False
+        self._opened_at = time.time()
+        self._lock = threading.Lock()  # serializes flushes (writer thread vs. close/flush callers)
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="session-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, event: Dict[str, Any]) -> None:
+        if self._closed:
+            return
+        if len(self._pending) == self._pending.maxlen:
+            self._drop(1, "queue", f"more than {self._pending.maxlen} events pending")
+        self._pending.append(event)
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            kept, lines = [], []
+            for e in batch:
+                try:
+                    lines.append(json.dumps(e) + "\n")
+                    kept.append(e)
+                except (TypeError, ValueError) as err:
+                    self._drop(1, "serialize", f"unserializable event ({err})")
+            if not lines:
+                return
+            try:
+                self._maybe_rotate()
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write("".join(lines))
+            except OSError as err:
+                # Keep the batch ahead of newer events; past max_pending the newest are lost
+                overflow = len(self._pending) + len(kept) - self._pending.maxlen
+                self._pending.extendleft(reversed(kept))
+                if overflow > 0:
+                    self._drop(overflow, "queue", f"more than {self._pending.maxlen} events pending")
+                self._warn("write", f"write failed, will retry ({err})")
+
+    def _warn(self, kind: str, msg: str) -> None:
+        if kind not in self._warned:
+            self._warned.add(kind)
+            print(f"Warning: session log {self.path}: {msg}")
+
+    def _drop(self, n: int, kind: str, msg: str) -> None:
+        self.dropped += n
+        self._warn(kind, f"{msg}; dropping events")
+
+    def _maybe_rotate(self) -> None:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            self._opened_at = time.time()
+            return
+        aged = self.rotate_interval is not None and time.time() - self._opened_at >= self.rotate_interval
+        if size < self.max_bytes and not aged:
+            return
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        dst, n = f"{self.path}.{stamp}", 1
+        while os.path.exists(dst) or os.path.exists(dst + ".gz"):
+            dst, n = f"{self.path}.{stamp}.{n}", n + 1
+        os.replace(self.path, dst)
+        self._opened_at = time.time()
+        if self.compress:
+            with open(dst, 'rb') as src, gzip.open(dst + ".gz", 'wb') as out:
+                shutil.copyfileobj(src, out)
+            os.remove(dst)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=2.0)
+        self.flush()
+        atexit.unregister(self.close)
+
+_LOGGERS: Dict[str, SessionLogger] = {}
+_LOGGERS_LOCK = threading.Lock()
+
+def get_session_logger(path: str, **kwargs) -> SessionLogger:
+    """Shared SessionLogger per path (kwargs apply only when it is first created)."""
+    key = os.path.abspath(path)
+    with _LOGGERS_LOCK:
+        logger = _LOGGERS.get(key)
+        if logger is None or logger._closed:
+            logger = _LOGGERS[key] = SessionLogger(path, **kwargs)
+        return logger
 
 def log_session_event(path: str, event: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
     event = {**event, "timestamp": int(time.time()*1000)}
-    with open(path, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(event) + "\n")
\ No newline at end of file
+    get_session_logger(path).log(event)
+
+def load_npz_mmap(path: str) -> Dict[str, Any]:
+    """Open an uncompressed .npz with every member memory-mapped (read-only) instead of read into RAM.
+
+    Members that are compressed or hold Python objects fall back to a regular load.
+    """
+    out: Dict[str, Any] = {}
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as raw:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as f:
+                    out[name] = npy_format.read_array(f, allow_pickle=False)
+                continue
+            # Local file header: 30 fixed bytes, then file name and extra field
+            raw.seek(info.header_offset)
+            fixed = raw.read(30)
+            name_len, extra_len = struct.unpack('<HH', fixed[26:30])
+            raw.seek(info.header_offset + 30 + name_len + extra_len)
+            version = npy_format.read_magic(raw)
+            if version == (1, 0):
+                shape, fortran, dtype = npy_format.read_array_header_1_0(raw)
+            else:
+                shape, fortran, dtype = npy_format.read_array_header_2_0(raw)
+            if dtype.hasobject:
+                with zf.open(info) as f:
+                    out[name] = npy_format.read_array(f, allow_pickle=False)
+                continue
+            offset = raw.tell()
+            if int(np.prod(shape)) == 0:
+                out[name] = np.empty(shape, dtype=dtype)
+            else:
+                out[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                                      order='F' if fortran else 'C')
+    return out